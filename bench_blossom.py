@@ -0,0 +1,549 @@
+import argparse
+import array
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import blossom
+
+def get_random_edges(vertice_count, edge_count, seed):
+    rng = random.Random(seed)
+    edges = set()
+    while len(edges) < edge_count:
+        v, w = rng.randrange(vertice_count), rng.randrange(vertice_count)
+        if v != w:
+            edges.add(tuple(sorted((v, w))))
+    return sorted(edges)
+
+def stream_random_edges(vertice_count, edge_count, seed):
+    rng = random.Random(seed)
+    for _ in range(edge_count):
+        yield rng.randrange(vertice_count), rng.randrange(vertice_count)
+
+def get_random_graph(vertice_count, edge_count, seed):
+    graph = blossom.Graph()
+    with blossom.validating(blossom.VALIDATION_OFF):
+        for edge in get_random_edges(vertice_count, edge_count, seed):
+            graph.add_edge(edge)
+    return graph
+
+def time_solve(graph, validation, engine, matching=None, max_augmentations=None):
+    if matching is None:
+        with blossom.validating(blossom.VALIDATION_OFF):
+            matching = blossom.Matching()
+            matching.add_vertices(graph.get_vertices())
+    start = time.perf_counter()
+    matching = blossom.get_maximum_matching(graph, matching, validation=validation, engine=engine, max_augmentations=max_augmentations)
+    return time.perf_counter() - start, matching
+
+def estimate_solve(graph, validation, engine, size, sample):
+
+    # Augmentations get dearer as the matching grows, so sample runs start a quarter, a half and three quarters of the
+    # way in as well as from the start, and their mean time per augmentation is scaled up to the whole solve.
+    seconds = 0
+    for fraction in (0, 0.25, 0.5, 0.75):
+        _, matching = time_solve(graph, blossom.VALIDATION_OFF, engine, max_augmentations=int(fraction * size))
+        sample_seconds, _ = time_solve(graph, validation, engine, matching, sample)
+        seconds += sample_seconds / sample
+    return seconds / 4 * size
+
+def bench_validation(edge_counts, degree, full_max_edges, seed, engine, full_sample=10):
+
+    # Above full_max_edges a full solve takes too long to run and is estimated from a few sampled augmentations
+    # instead, marked ~. The estimate has come within a factor of two of real runs.
+    levels = (
+        ('off', blossom.VALIDATION_OFF),
+        ('local', blossom.VALIDATION_LOCAL),
+        ('full', blossom.VALIDATION_FULL),
+    )
+    print('%10s %10s %10s %12s %10s' % ('edges', 'vertices', 'level', 'seconds', 'matched'))
+    for edge_count in edge_counts:
+        vertice_count = max(2, 2 * edge_count // degree)
+        graph = get_random_graph(vertice_count, edge_count, seed)
+        for name, level in levels:
+            if level == blossom.VALIDATION_FULL and edge_count > full_max_edges:
+                seconds = estimate_solve(graph, level, engine, size, full_sample)
+                print('%10d %10d %10s %12s %10d' % (edge_count, vertice_count, name, '~%.3f' % seconds, size))
+                continue
+            seconds, matching = time_solve(graph, level, engine)
+            size = len(matching.edges)
+            print('%10d %10d %10s %12.3f %10d' % (edge_count, vertice_count, name, seconds, size))
+            sys.stdout.flush()
+
+def build_dict(edges):
+    graph = blossom.Graph()
+    for edge in edges:
+        graph.add_edge(edge)
+    matching = blossom.Matching()
+    matching.add_vertices(graph.get_vertices())
+    return graph, matching
+
+def build_compact(edges):
+    graph = blossom.CompactGraph(edges)
+    return graph, blossom.CompactMatching(graph)
+
+def bench_compact(edge_counts, degree, seed, engine):
+    print('%10s %10s %10s %14s %12s %12s %10s' % ('edges', 'vertices', 'type', 'bytes/edge', 'build', 'solve', 'matched'))
+    for edge_count in edge_counts:
+        vertice_count = max(2, 2 * edge_count // degree)
+        edges = get_random_edges(vertice_count, edge_count, seed)
+        for name, build in (('dict', build_dict), ('compact', build_compact)):
+            with blossom.validating(blossom.VALIDATION_OFF):
+                tracemalloc.start()
+                graph, matching = build(edges)
+                size, _ = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                del graph, matching
+                start = time.perf_counter()
+                graph, matching = build(edges)
+                built = time.perf_counter()
+                matching = blossom.get_maximum_matching(graph, matching, engine=engine)
+                solved = time.perf_counter()
+                matched = len(matching.get_edges())
+            print('%10d %10d %10s %14.1f %12.3f %12.3f %10d' % (edge_count, vertice_count, name, size / edge_count, built - start, solved - built, matched))
+            sys.stdout.flush()
+
+def bench_warm_start(edge_counts, degree, seed, engine):
+    print('%10s %10s %10s %12s %10s %10s' % ('edges', 'vertices', 'warm', 'seconds', 'initial', 'matched'))
+    for edge_count in edge_counts:
+        vertice_count = max(2, 2 * edge_count // degree)
+        graph = blossom.CompactGraph(get_random_edges(vertice_count, edge_count, seed))
+        for warm_start in (False, True):
+            with blossom.validating(blossom.VALIDATION_OFF):
+                start = time.perf_counter()
+                solution = blossom.solve(graph, engine=engine, warm_start=warm_start, seed=seed)
+                seconds = time.perf_counter() - start
+            initial = solution.get_warm_start_size() if warm_start else 0
+            print('%10d %10d %10s %12.3f %10d %10d' % (edge_count, vertice_count, warm_start, seconds, initial, solution.get_size()))
+            sys.stdout.flush()
+
+def bench_dynamic(edge_counts, degree, seed, engine, updates=200):
+    print('%10s %10s %14s %14s %10s' % ('edges', 'vertices', 'per update', 'per re-solve', 'matched'))
+    for edge_count in edge_counts:
+        vertice_count = max(2, 2 * edge_count // degree)
+        edges = get_random_edges(vertice_count, edge_count, seed)
+        rng = random.Random(seed)
+        with blossom.validating(blossom.VALIDATION_OFF):
+            solver = blossom.DynamicSolver()
+            solver.add_edges(edges)
+            # Edges live in a list with their positions alongside, so picking one to remove is constant time and the
+            # timer only sees the solver.
+            positions = {edge: i for i, edge in enumerate(edges)}
+            start = time.perf_counter()
+            for _ in range(updates):
+                if rng.random() < 0.5:
+                    edge = tuple(sorted(rng.sample(range(vertice_count), 2)))
+                    if edge not in positions:
+                        solver.add_edge(edge)
+                        positions[edge] = len(edges)
+                        edges.append(edge)
+                else:
+                    i = rng.randrange(len(edges))
+                    edge = edges[i]
+                    solver.remove_edge(edge)
+                    edges[i] = edges[-1]
+                    positions[edges[i]] = i
+                    edges.pop()
+                    del positions[edge]
+            per_update = (time.perf_counter() - start) / updates
+            start = time.perf_counter()
+            solution = blossom.solve(blossom.CompactGraph(edges), engine=engine, seed=seed)
+            per_solve = time.perf_counter() - start
+        assert solution.get_size() == solver.get_size()
+        print('%10d %10d %14.6f %14.6f %10d' % (edge_count, vertice_count, per_update, per_solve, solver.get_size()))
+        sys.stdout.flush()
+
+def bench_components(edge_counts, degree, seed, engine, component_size=20):
+    print('%10s %10s %10s %12s %10s' % ('edges', 'vertices', 'workers', 'seconds', 'matched'))
+    for edge_count in edge_counts:
+        vertice_count = max(2, 2 * edge_count // degree)
+        component_count = max(1, vertice_count // component_size)
+        edges = []
+        for i in range(component_count):
+            for v, w in get_random_edges(max(2, vertice_count // component_count), max(1, edge_count // component_count), seed + i):
+                edges.append(((i, v), (i, w)))
+        graph = blossom.CompactGraph(edges)
+        for workers in (None, 1, 2, 4):
+            with blossom.validating(blossom.VALIDATION_OFF):
+                start = time.perf_counter()
+                if workers is None:
+                    solution = blossom.solve(graph, engine=engine, seed=seed)
+                else:
+                    solution = blossom.solve_components(graph, engine=engine, seed=seed, workers=workers)
+                seconds = time.perf_counter() - start
+            print('%10d %10d %10s %12.3f %10d' % (edge_count, vertice_count, workers or '-', seconds, solution.get_size()))
+            sys.stdout.flush()
+
+def bench_bipartite(edge_counts, degree, seed, engine):
+    print('%10s %10s %14s %12s %10s' % ('edges', 'vertices', 'engine', 'seconds', 'matched'))
+    for edge_count in edge_counts:
+        vertice_count = max(2, 2 * edge_count // degree)
+        edges = [(('left', v), ('right', w)) for v, w in get_random_edges(vertice_count, edge_count, seed)]
+        graph = blossom.CompactGraph(edges)
+        for bipartite in (False, True):
+            with blossom.validating(blossom.VALIDATION_OFF):
+                start = time.perf_counter()
+                solution = blossom.solve(graph, engine=None if bipartite else engine, seed=seed)
+                seconds = time.perf_counter() - start
+            print('%10d %10d %14s %12.3f %10d' % (edge_count, vertice_count, solution.get_engine(), seconds, solution.get_size()))
+            sys.stdout.flush()
+
+def bench_load(edge_counts, degree, seed):
+    print('%10s %10s %14s %12s %10s' % ('edges', 'vertices', 'loader', 'seconds', 'loaded'))
+    for edge_count in edge_counts:
+        vertice_count = max(2, 2 * edge_count // degree)
+        edges = get_random_edges(vertice_count, edge_count, seed)
+        loaders = [
+            ('add_edge', lambda: build_dict(edges)),
+            ('pairs', lambda: blossom.load_graph(edges)),
+            ('pairs compact', lambda: blossom.load_graph(edges, compact=True)),
+        ]
+        if blossom.numpy is not None:
+            edge_array = blossom.numpy.array(edges)
+            loaders.append(('array', lambda: blossom.load_graph(edge_array)))
+            loaders.append(('array compact', lambda: blossom.load_graph(edge_array, compact=True)))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'edges.bin')
+            with open(path, 'wb') as file:
+                array.array('i', [v for edge in edges for v in edge]).tofile(file)
+            loaders.append(('file', lambda: blossom.load_graph_file(path, binary=True)))
+            loaders.append(('file compact', lambda: blossom.load_graph_file(path, binary=True, compact=True)))
+            text_path = os.path.join(directory, 'edges.txt')
+            with open(text_path, 'w') as file:
+                file.writelines('%d %d\n' % edge for edge in edges)
+            loaders.append(('text compact', lambda: blossom.load_graph_file(text_path, compact=True)))
+            snapshot_path = os.path.join(directory, 'graph.snapshot')
+            with blossom.validating(blossom.VALIDATION_OFF):
+                blossom.save_graph(blossom.load_graph(edges, compact=True)[0], snapshot_path)
+            loaders.append(('snapshot', lambda: blossom.load_graph_snapshot(snapshot_path)))
+            for name, load in loaders:
+                with blossom.validating(blossom.VALIDATION_OFF):
+                    start = time.perf_counter()
+                    graph, matching = load()
+                    seconds = time.perf_counter() - start
+                print('%10d %10d %14s %12.3f %10d' % (edge_count, vertice_count, name, seconds, len(graph.get_vertices())))
+                sys.stdout.flush()
+                del graph, matching
+
+def bench_stream(edge_counts, degree, seed, engine, epsilons=(None, 0.2, 0.1)):
+    print('%10s %10s %10s %12s %14s %10s %10s' % ('edges', 'vertices', 'epsilon', 'seconds', 'peak bytes', 'matched', 'maximum'))
+    for edge_count in edge_counts:
+        vertice_count = max(2, 2 * edge_count // degree)
+        edges = lambda: stream_random_edges(vertice_count, edge_count, seed)
+        with blossom.validating(blossom.VALIDATION_OFF):
+            maximum = blossom.solve(blossom.CompactGraph(edges()), engine=engine, seed=seed).get_size()
+            for epsilon in ('greedy',) + tuple(epsilons):
+                tracemalloc.start()
+                start = time.perf_counter()
+                if epsilon == 'greedy':
+                    matching = blossom.get_streaming_matching(edges, passes=0)
+                else:
+                    matching = blossom.get_streaming_matching(edges, epsilon=epsilon)
+                seconds = time.perf_counter() - start
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print('%10d %10d %10s %12.3f %14d %10d %10d' % (edge_count, vertice_count, epsilon or '1/3', seconds, peak, len(matching.edges), maximum))
+                sys.stdout.flush()
+
+def score_by_loop(graph, matchings):
+    scores = []
+    for edges in matchings:
+        matched = set()
+        missing_edge_count = conflict_count = 0
+        for v, w in edges.tolist():
+            if v not in graph.indices or w not in graph.get_neighbors(v):
+                missing_edge_count += 1
+            for t in (v, w):
+                if t in matched:
+                    conflict_count += 1
+                matched.add(t)
+        scores.append((missing_edge_count, conflict_count))
+    return scores
+
+def bench_score(edge_counts, degree, seed, engine, matching_count=1000):
+    print('%10s %10s %10s %10s %12s %12s' % ('edges', 'vertices', 'matchings', 'scorer', 'seconds', 'per second'))
+    numpy = blossom.numpy
+    for edge_count in edge_counts:
+        vertice_count = max(2, 2 * edge_count // degree)
+        with blossom.validating(blossom.VALIDATION_OFF):
+            graph, matching = blossom.load_graph(numpy.array(get_random_edges(vertice_count, edge_count, seed)), compact=True)
+            maximum = numpy.array(sorted(blossom.solve(graph, matching, engine=engine, seed=seed).get_matching().get_edges()))
+        rng = numpy.random.default_rng(seed)
+        matchings = []
+        for _ in range(matching_count):
+            edges = maximum[rng.permutation(len(maximum))]
+            edges[0, 1] = edges[1, 0]
+            matchings.append(edges)
+        scorers = [('numpy', blossom.score_matchings), ('loop', score_by_loop)]
+        for name, score in scorers:
+            start = time.perf_counter()
+            score(graph, matchings)
+            seconds = time.perf_counter() - start
+            print('%10d %10d %10d %10s %12.3f %12.0f' % (edge_count, vertice_count, matching_count, name, seconds, matching_count / seconds))
+            sys.stdout.flush()
+
+def bench_epsilon(edge_counts, degree, seed, epsilons=(0.5, 0.2, 0.1, 0.05, 0.01)):
+    print('%10s %10s %10s %12s %10s %10s %10s' % ('edges', 'vertices', 'epsilon', 'seconds', 'matched', 'maximum', 'guarantee'))
+    for edge_count in edge_counts:
+        vertice_count = max(2, 2 * edge_count // degree)
+        with blossom.validating(blossom.VALIDATION_OFF):
+            graph, matching = blossom.load_graph(get_random_edges(vertice_count, edge_count, seed), compact=True)
+            start = time.perf_counter()
+            maximum = blossom.solve(graph, matching, engine=blossom.ENGINE_FOREST, seed=seed).get_size()
+            seconds = time.perf_counter() - start
+            print('%10d %10d %10s %12.3f %10d %10d %10.4f' % (edge_count, vertice_count, '-', seconds, maximum, maximum, 1.0))
+            for epsilon in epsilons:
+                start = time.perf_counter()
+                solution = blossom.solve(graph, matching, seed=seed, epsilon=epsilon)
+                seconds = time.perf_counter() - start
+                print('%10d %10d %10.2f %12.3f %10d %10d %10.4f' % (edge_count, vertice_count, epsilon, seconds, solution.get_size(), maximum, solution.get_guarantee()))
+                sys.stdout.flush()
+
+def bench_kernel(edge_counts, degree, seed, engine):
+    print('%10s %10s %10s %12s %12s %10s %10s' % ('edges', 'vertices', 'kernelize', 'seconds', 'reduced', 'residual', 'matched'))
+    for edge_count in edge_counts:
+        vertice_count = max(2, 2 * edge_count // degree)
+        with blossom.validating(blossom.VALIDATION_OFF):
+            graph, _ = blossom.load_graph(get_random_edges(vertice_count, edge_count, seed), compact=True)
+            for kernelize in (False, True):
+                start = time.perf_counter()
+                solution = blossom.solve(graph, engine=engine, seed=seed, kernelize=kernelize)
+                seconds = time.perf_counter() - start
+                ratio = solution.get_reduction_ratio() if kernelize else 0.0
+                print('%10d %10d %10s %12.3f %12.3f %10d %10d' % (edge_count, vertice_count, kernelize, seconds, ratio, round((1 - ratio) * len(graph)), solution.get_size()))
+                sys.stdout.flush()
+
+def get_cache_edges(shape, edge_count, degree, seed):
+    if shape == 'complete':
+        k = max(2, round((1 + math.sqrt(1 + 8 * edge_count)) / 2))
+        return [(v, w) for v in range(k) for w in range(v + 1, k)]
+    if shape == 'grid':
+        k = max(2, round(math.sqrt(edge_count / 2)))
+        return get_grid_edges(k, k)
+    return get_random_edges(max(2, 2 * edge_count // degree), edge_count, seed)
+
+def bench_cache(edge_counts, degree, seed, engine):
+
+    # The miss column fills an empty cache and the hit column looks up the same graph with its vertices shuffled, so
+    # both include putting every component in canonical order. A hit only pays off where it beats the solve column.
+    print('%10s %10s %10s %12s %12s %12s %10s' % ('shape', 'edges', 'vertices', 'solve', 'miss', 'hit', 'hits'))
+    for edge_count in edge_counts:
+        for shape in ('complete', 'grid', 'random'):
+            edges = get_cache_edges(shape, edge_count, degree, seed)
+            vertices = sorted(set(v for edge in edges for v in edge))
+            shuffled = vertices[:]
+            random.Random(seed).shuffle(shuffled)
+            relabel = dict(zip(vertices, shuffled))
+            with blossom.validating(blossom.VALIDATION_OFF):
+                graph, _ = blossom.load_graph(edges, compact=True)
+                copy, _ = blossom.load_graph([(relabel[v], relabel[w]) for v, w in edges], compact=True)
+                cache = blossom.MatchingCache()
+                start = time.perf_counter()
+                blossom.solve(graph, engine=engine)
+                solved = time.perf_counter()
+                cache.get_maximum_matching(graph, engine)
+                missed = time.perf_counter()
+                cache.get_maximum_matching(copy, engine)
+                hit = time.perf_counter()
+            print('%10s %10d %10d %12.3f %12.3f %12.3f %10d' % (shape, len(edges), len(vertices), solved - start, missed - solved, hit - missed, cache.get_hit_count()))
+            sys.stdout.flush()
+
+# https://doi.org/10.1103/PhysRevE.71.036113
+def get_gnp_edges(vertice_count, edge_probability, seed):
+    rng = random.Random(seed)
+    edges = []
+    if edge_probability <= 0:
+        return edges
+    v, w = 1, -1
+    while v < vertice_count:
+        if edge_probability < 1:
+            w += 1 + int(math.log(1 - rng.random()) / math.log(1 - edge_probability))
+        else:
+            w += 1
+        while w >= v and v < vertice_count:
+            w -= v
+            v += 1
+        if v < vertice_count:
+            edges.append((v, w))
+    return edges
+
+def get_regular_edges(vertice_count, degree, seed):
+
+    # Configuration model. Self-loops and repeated pairs are dropped rather than resampled, so a few vertices end up
+    # just short of the degree.
+    rng = random.Random(seed)
+    if vertice_count * degree % 2 == 1:
+        vertice_count += 1
+    stubs = [v for v in range(vertice_count) for _ in range(degree)]
+    rng.shuffle(stubs)
+    return sorted(set(tuple(sorted(stubs[i:i + 2])) for i in range(0, len(stubs), 2) if stubs[i] != stubs[i + 1]))
+
+def get_grid_edges(row_count, column_count):
+    edges = []
+    for r in range(row_count):
+        for c in range(column_count):
+            v = r * column_count + c
+            if c + 1 < column_count:
+                edges.append((v, v + 1))
+            if r + 1 < row_count:
+                edges.append((v, v + column_count))
+    return edges
+
+def get_bipartite_edges(side_count, edge_count, seed):
+    rng = random.Random(seed)
+    edges = set()
+    while len(edges) < min(edge_count, side_count * side_count):
+        edges.add((rng.randrange(side_count), side_count + rng.randrange(side_count)))
+    return sorted(edges)
+
+def get_nested_cycle_edges(level_count, cycle_length=3):
+
+    # Each level joins an odd number of copies of the previous level into a cycle, from the last vertice of one copy to
+    # the first vertice of the next, so every odd cycle is made of odd cycles. The vertice count stays odd, and proving
+    # the last vertice exposed means contracting the whole nesting.
+    edges = []
+    size = 1
+    for _ in range(level_count):
+        edges = [(v + i * size, w + i * size) for i in range(cycle_length) for v, w in edges]
+        edges.extend((i * size + size - 1, (i + 1) % cycle_length * size) for i in range(cycle_length))
+        size *= cycle_length
+    return edges
+
+def get_suite_edges(generator, edge_count, degree, seed):
+    if generator == 'gnp':
+        vertice_count = max(2, 2 * edge_count // degree)
+        return get_gnp_edges(vertice_count, edge_count / (vertice_count * (vertice_count - 1) / 2), seed)
+    if generator == 'regular':
+        return get_regular_edges(max(degree + 1, 2 * edge_count // degree), degree, seed)
+    if generator == 'grid':
+        side = max(2, int(math.sqrt(edge_count / 2)))
+        return get_grid_edges(side, side)
+    if generator == 'bipartite':
+        return get_bipartite_edges(max(2, edge_count // degree), edge_count, seed)
+    level_count = 1
+    while 3 ** (level_count + 1) * 3 // 2 <= edge_count:
+        level_count += 1
+    return get_nested_cycle_edges(level_count)
+
+SUITE_GENERATORS = ('gnp', 'regular', 'grid', 'bipartite', 'nested')
+
+def run_suite_case(edges, engine):
+
+    # The timed run goes without an observer. Counters and peak memory come from a second, observed run.
+    with blossom.validating(blossom.VALIDATION_OFF):
+        graph, matching = blossom.load_graph(edges)
+        start = time.perf_counter()
+        maximum = blossom.get_maximum_matching(graph, matching, engine=engine)
+        seconds = time.perf_counter() - start
+        stats = blossom.Stats()
+        tracemalloc.start()
+        blossom.get_maximum_matching(graph, matching, engine=engine, stats=stats)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {
+        'vertices': len(graph.get_vertices()),
+        'seconds': seconds,
+        'peak_bytes': peak,
+        'augmentations': stats.augmentation_count,
+        'contractions': stats.contraction_count,
+        'max_depth': stats.max_depth,
+        'edges_scanned': stats.edge_scan_count,
+        'matched': len(maximum.edges),
+    }
+
+def bench_suite(edge_counts, degree, seed, engine, contract_max_edges, output):
+    print('%10s %10s %10s %10s %12s %14s %13s %13s %10s %10s' % ('generator', 'edges', 'vertices', 'engine', 'seconds', 'peak bytes', 'augmentations', 'contractions', 'depth', 'matched'))
+    results = []
+    for generator in SUITE_GENERATORS:
+        for edge_count in edge_counts:
+            if engine == blossom.ENGINE_CONTRACT and edge_count > contract_max_edges:
+                continue
+            result = {'generator': generator, 'edges': edge_count, 'engine': engine}
+            result.update(run_suite_case(get_suite_edges(generator, edge_count, degree, seed), engine))
+            results.append(result)
+            print('%10s %10d %10d %10s %12.3f %14d %13d %13d %10d %10d' % (generator, edge_count, result['vertices'], engine, result['seconds'], result['peak_bytes'], result['augmentations'], result['contractions'], result['max_depth'], result['matched']))
+            sys.stdout.flush()
+    if output is not None:
+        with open(output, 'w') as file:
+            json.dump({'degree': degree, 'seed': seed, 'results': results}, file, indent=2, sort_keys=True)
+    return results
+
+def compare_suite(results, baseline_path, threshold, min_seconds):
+    with open(baseline_path) as file:
+        baseline = {(r['generator'], r['edges'], r['engine']): r for r in json.load(file)['results']}
+    print()
+    print('%10s %10s %10s %12s %12s %10s' % ('generator', 'edges', 'engine', 'time ratio', 'peak ratio', 'status'))
+    regression_count = 0
+    for result in results:
+        previous = baseline.get((result['generator'], result['edges'], result['engine']))
+        if previous is None:
+            continue
+        time_ratio = result['seconds'] / max(previous['seconds'], 1e-9)
+        peak_ratio = result['peak_bytes'] / max(previous['peak_bytes'], 1)
+        status = 'ok'
+        if result['matched'] != previous['matched']:
+            status = 'MISMATCH'
+        elif (time_ratio > 1 + threshold and previous['seconds'] >= min_seconds) or peak_ratio > 1 + threshold:
+            status = 'REGRESSION'
+        if status != 'ok':
+            regression_count += 1
+        print('%10s %10d %10s %12.2f %12.2f %10s' % (result['generator'], result['edges'], result['engine'], time_ratio, peak_ratio, status))
+    return regression_count
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--edges', type=int, nargs='+')
+    parser.add_argument('--degree', type=int, default=10)
+    parser.add_argument('--full-max-edges', type=int, default=300)
+    parser.add_argument('--full-sample', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--engine', choices=[blossom.ENGINE_CONTRACT, blossom.ENGINE_BASES, blossom.ENGINE_FOREST])
+    parser.add_argument('--mode', choices=['validation', 'compact', 'warm', 'dynamic', 'components', 'bipartite', 'load', 'stream', 'score', 'epsilon', 'kernel', 'cache', 'suite'], default='validation')
+    parser.add_argument('--contract-max-edges', type=int, default=1000)
+    parser.add_argument('--output')
+    parser.add_argument('--compare')
+    parser.add_argument('--threshold', type=float, default=0.25)
+    parser.add_argument('--min-seconds', type=float, default=0.01)
+    args = parser.parse_args()
+    if args.edges is None:
+        args.edges = [100, 1000, 10000, 100000, 1000000] if args.mode == 'suite' else [300, 1000, 10000]
+
+    # The contraction engine stops at contract_max_edges, so the suite defaults to the forest engine to reach the sizes
+    # it lists. Every other mode defaults to the contraction engine.
+    if args.engine is None:
+        args.engine = blossom.ENGINE_FOREST if args.mode == 'suite' else blossom.ENGINE_CONTRACT
+    if args.mode == 'compact':
+        bench_compact(args.edges, args.degree, args.seed, args.engine)
+    elif args.mode == 'warm':
+        bench_warm_start(args.edges, args.degree, args.seed, args.engine)
+    elif args.mode == 'dynamic':
+        bench_dynamic(args.edges, args.degree, args.seed, args.engine)
+    elif args.mode == 'components':
+        bench_components(args.edges, args.degree, args.seed, args.engine)
+    elif args.mode == 'bipartite':
+        bench_bipartite(args.edges, args.degree, args.seed, args.engine)
+    elif args.mode == 'load':
+        bench_load(args.edges, args.degree, args.seed)
+    elif args.mode == 'stream':
+        bench_stream(args.edges, args.degree, args.seed, args.engine)
+    elif args.mode == 'score':
+        bench_score(args.edges, args.degree, args.seed, args.engine)
+    elif args.mode == 'epsilon':
+        bench_epsilon(args.edges, args.degree, args.seed)
+    elif args.mode == 'kernel':
+        bench_kernel(args.edges, args.degree, args.seed, blossom.ENGINE_FOREST if args.engine == blossom.ENGINE_CONTRACT else args.engine)
+    elif args.mode == 'cache':
+        bench_cache(args.edges, args.degree, args.seed, blossom.ENGINE_FOREST if args.engine == blossom.ENGINE_CONTRACT else args.engine)
+    elif args.mode == 'suite':
+        results = bench_suite(args.edges, args.degree, args.seed, args.engine, args.contract_max_edges, args.output)
+        if args.compare is not None and compare_suite(results, args.compare, args.threshold, args.min_seconds) > 0:
+            sys.exit(1)
+    else:
+        bench_validation(args.edges, args.degree, args.full_max_edges, args.seed, args.engine, args.full_sample)
+
+if __name__ == '__main__':
+    main()
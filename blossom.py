@@ -1,23 +1,136 @@
+import array
+import asyncio
+import collections
+import concurrent.futures
+import contextlib
+import hashlib
+import math
+import mmap
+import os
+import random
+import threading
+import time
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+VALIDATION_OFF = 0
+VALIDATION_LOCAL = 1
+VALIDATION_FULL = 2
+
+_default_validation = VALIDATION_FULL
+
+class _Validation(threading.local):
+
+    # Only a level set by validating is kept per thread. Without one, every lookup reads the process-wide default, so
+    # set_validation reaches threads that have already run.
+
+    def __init__(self):
+        self.override = None
+
+    @property
+    def level(self):
+        return _default_validation if self.override is None else self.override
+
+_validation = _Validation()
+
+def get_validation():
+    return _validation.level
+
+def set_validation(level):
+    global _default_validation
+    assert level in (VALIDATION_OFF, VALIDATION_LOCAL, VALIDATION_FULL), 'Validation level must be off, local or full'
+    _default_validation = level
+
+@contextlib.contextmanager
+def validating(level):
+    assert level in (VALIDATION_OFF, VALIDATION_LOCAL, VALIDATION_FULL), 'Validation level must be off, local or full'
+    previous = _validation.override
+    _validation.override = level
+    try:
+        yield
+    finally:
+        _validation.override = previous
+
+ENGINE_CONTRACT = 'contract'
+ENGINE_BASES = 'bases'
+ENGINE_FOREST = 'forest'
+ENGINE_HOPCROFT_KARP = 'hopcroft-karp'
+
+STATUS_MAXIMUM = 'maximum'
+STATUS_TARGET = 'target'
+STATUS_BUDGET = 'budget'
+STATUS_APPROXIMATE = 'approximate'
+STATUS_CANCELLED = 'cancelled'
+
 # https://en.wikipedia.org/wiki/Blossom_algorithm
-def get_maximum_matching(graph, matching):
-    augmenting_path = get_augmenting_path(graph, matching)
-    if len(augmenting_path) > 0:
-        return get_maximum_matching(graph, matching.augment(augmenting_path))
-    else:
+def get_maximum_matching(graph, matching, validation=None, engine=None, stats=None, solver=None, target_size=None, deadline=None, max_augmentations=None, checkpoint=None, checkpoint_interval=1000, epsilon=None):
+    if validation is not None:
+        with validating(validation):
+            return get_maximum_matching(graph, matching, engine=engine, stats=stats, solver=solver, target_size=target_size, deadline=deadline, max_augmentations=max_augmentations, checkpoint=checkpoint, checkpoint_interval=checkpoint_interval, epsilon=epsilon)
+    progress = _get_progress(matching, target_size, deadline, max_augmentations, checkpoint, checkpoint_interval)
+    if epsilon is not None:
+        return _get_approximate_matching(graph, matching, epsilon, stats, solver, progress)[0]
+    return _get_maximum_matching(graph, matching, engine, stats, solver, progress)
+
+def _get_maximum_matching(graph, matching, engine, stats, solver, progress):
+    if solver is None:
+        solver = Solver()
+    engine = _get_engine(graph, engine)
+    if engine == ENGINE_BASES:
+        return _get_maximum_matching_by(graph, matching, lambda adjacency, mates: _augment_by_bases(adjacency, mates, False, stats, solver), stats, progress)
+    if engine == ENGINE_FOREST:
+        return _get_maximum_matching_by(graph, matching, lambda adjacency, mates: _augment_by_bases(adjacency, mates, True, stats, solver), stats, progress)
+    if engine == ENGINE_HOPCROFT_KARP:
+        return _get_maximum_matching_by(graph, matching, _augment_by_hopcroft_karp, stats, progress)
+    assert engine == ENGINE_CONTRACT, 'Engine must be contract, bases, forest or hopcroft-karp'
+    matching = matching.copy()
+    if progress is not None and progress.is_spent():
         return matching
+    augmenting_path = get_augmenting_path(graph, matching, stats=stats, solver=solver)
+    while len(augmenting_path) > 0:
+        if stats is None:
+            matching.augment_in_place(augmenting_path)
+        else:
+            start = time.perf_counter()
+            matching.augment_in_place(augmenting_path)
+            stats.seconds['augment'] += time.perf_counter() - start
+            stats.on_augment(augmenting_path)
+        if progress is not None and progress.on_augment(matching):
+            break
+        augmenting_path = get_augmenting_path(graph, matching, stats=stats, solver=solver)
+    return matching
 
 # https://en.wikipedia.org/wiki/Blossom_algorithm
-def get_augmenting_path(graph, matching):
+def get_augmenting_path(graph, matching, engine=None, stats=None, solver=None):
+    if solver is None:
+        solver = Solver()
+    engine = _get_engine(graph, engine)
+    if stats is not None:
+        start = time.perf_counter()
+    if engine == ENGINE_BASES or engine == ENGINE_FOREST:
+        labels, adjacency, mates = _index_any(graph, matching)
+        augmenting_paths = _get_augmenting_paths_by_bases(adjacency, mates, stats=stats, solver=solver)
+        if stats is not None:
+            stats.seconds['search'] += time.perf_counter() - start
+        for augmenting_path in augmenting_paths:
+            return [labels[v] for v in augmenting_path]
+        return []
+    assert engine == ENGINE_CONTRACT, 'Engine must be contract, bases or forest'
+
+    # Every even vertice is scanned once per search in a single pass over its neighbors, so the cursor into its
+    # neighbors is just the loop iterator, and the graph is only read while searching.
     forest = Forest()
-    graph.unmark_all_edges()
-    graph.mark_edges(matching.get_edges())
+    adjacency = graph.adjacency
     for exposed_vertice in matching.get_exposed_vertices():
         forest.add_singleton_tree(exposed_vertice)
     v = forest.get_unmarked_even_vertice()
+    edge_scan_count = 0
     while v is not None:
-        e = graph.get_unmarked_neighboring_edge(v)
-        while e is not None:
-            _, w = e
+        for w in adjacency.get(v, ()):
+            edge_scan_count += 1
             if not forest.does_contain_vertice(w):
                 x = matching.get_matched_vertice(w)
                 forest.add_edge((v, w))
@@ -28,64 +141,1064 @@ def get_augmenting_path(graph, matching):
                 else:
                     if forest.get_root(v) != forest.get_root(w):
                         path = forest.get_path_from_root_to(v) + forest.get_path_to_root_from(w)
+                        if stats is not None:
+                            _report_search(stats, start, len(forest), edge_scan_count)
                         return path
                     else:
-                        blossom = forest.get_blossom(v, w)
+                        blossom = forest.get_blossom(v, w, solver.get_blossom_id())
+                        if stats is not None:
+                            start = _report_search(stats, start, len(forest), edge_scan_count)
+                            stats.depth += 1
+                            stats.on_blossom(len(blossom.get_vertices()), stats.depth)
                         graph_prime = graph.contract(blossom)
                         matching_prime = matching.contract(blossom)
-                        path_prime = get_augmenting_path(graph_prime, matching_prime)
+                        if stats is not None:
+                            stats.seconds['contract'] += time.perf_counter() - start
+                        path_prime = get_augmenting_path(graph_prime, matching_prime, stats=stats, solver=solver)
+                        if stats is not None:
+                            stats.depth -= 1
+                            start = time.perf_counter()
                         path = graph.lift_path(path_prime, blossom)
+                        if stats is not None:
+                            stats.seconds['lift'] += time.perf_counter() - start
                         return path
-            graph.mark_edge(e)
-            e = graph.get_unmarked_neighboring_edge(v)
         forest.mark_vertice(v)
         v = forest.get_unmarked_even_vertice()
+    if stats is not None:
+        _report_search(stats, start, len(forest), edge_scan_count)
     return []
 
+def _report_search(stats, start, forest_size, edge_scan_count):
+    now = time.perf_counter()
+    stats.seconds['search'] += now - start
+    stats.on_search(forest_size, edge_scan_count)
+    return now
+
+def solve(graph, matching=None, validation=None, engine=None, warm_start=True, seed=None, bipartite=True, stats=None, solver=None, target_size=None, deadline=None, max_augmentations=None, certify=False, checkpoint=None, checkpoint_interval=1000, epsilon=None, kernelize=False):
+    if validation is not None:
+        with validating(validation):
+            return solve(graph, matching, engine=engine, warm_start=warm_start, seed=seed, bipartite=bipartite, stats=stats, solver=solver, target_size=target_size, deadline=deadline, max_augmentations=max_augmentations, certify=certify, checkpoint=checkpoint, checkpoint_interval=checkpoint_interval, epsilon=epsilon, kernelize=kernelize)
+    if kernelize:
+        assert matching is None, 'Kernelization must start from an empty matching'
+        assert target_size is None and max_augmentations is None and checkpoint is None, 'Kernelization must not be combined with limits on augmentations'
+        kernel = Kernel(graph)
+        solution = solve(kernel.get_graph(), engine=engine, warm_start=warm_start, seed=seed, bipartite=bipartite, stats=stats, solver=solver, deadline=deadline, epsilon=epsilon)
+        matching = kernel.get_matching(solution.get_matching())
+        status = solution.get_status()
+        guarantee = solution.get_guarantee()
+        size = len(matching.get_edges())
+        residual_size = solution.get_size()
+        if guarantee is not None and 0.0 < guarantee < 1.0 and size > 0:
+            guarantee = size / (size - residual_size + residual_size / guarantee)
+        certificate = get_certificate(graph, matching) if certify and status == STATUS_MAXIMUM else None
+        return Solution(matching, solution.get_warm_start_size(), solution.get_engine(), status, certificate, guarantee, kernel.get_reduction_ratio())
+    if matching is None:
+        matching = _get_exposed_matching(graph)
+    colors = _get_indexed_colors(graph) if engine is None and bipartite and epsilon is None else None
+    if epsilon is not None:
+        engine = ENGINE_FOREST
+    engine = ENGINE_HOPCROFT_KARP if colors is not None else _get_engine(graph, engine)
+    warm_start_size = None
+    if warm_start:
+        matching = get_maximal_matching(graph, matching, seed)
+        warm_start_size = len(matching.get_edges())
+    progress = _get_progress(matching, target_size, deadline, max_augmentations, checkpoint, checkpoint_interval)
+    guarantee = 1.0
+    if epsilon is not None:
+        matching, guarantee = _get_approximate_matching(graph, matching, epsilon, stats, solver, progress)
+    elif colors is not None:
+        matching = _get_maximum_matching_by(graph, matching, lambda adjacency, mates: _augment_by_hopcroft_karp(adjacency, mates, colors), stats, progress)
+    else:
+        matching = _get_maximum_matching(graph, matching, engine, stats, solver, progress)
+    status = STATUS_MAXIMUM if progress is None else progress.status
+    if epsilon is not None and status == STATUS_MAXIMUM and guarantee < 1.0:
+        status = STATUS_APPROXIMATE
+    if epsilon is None and status != STATUS_MAXIMUM:
+        guarantee = None
+    certificate = get_certificate(graph, matching) if certify and status == STATUS_MAXIMUM else None
+    return Solution(matching, warm_start_size, engine, status, certificate, guarantee)
+
+# https://doi.org/10.1137/0202019
+def _get_approximate_matching(graph, matching, epsilon, stats, solver, progress):
+
+    # Without augmenting paths of at most 2k - 1 edges a matching has at least k / (k + 1) of the maximum size, which
+    # is 1 - epsilon for k = 1 / epsilon. Searches here only scan even vertices closer than that to their root. Blossoms
+    # do not keep tree distances shortest though, so a pruned search that finds nothing does not rule out every short
+    # path, and the bound is not taken on trust. The odd vertices of the last search instead give a Tutte-Berge upper
+    # bound on the maximum, and the guarantee returned is the size reached over that bound.
+
+    assert 0 < epsilon < 1, 'Epsilon must be between zero and one'
+    if solver is None:
+        solver = Solver()
+    max_length = 2 * math.ceil(1 / epsilon) + 1
+    parities = []
+
+    def augment(adjacency, mates):
+        while True:
+            parities[:] = [0] * len(adjacency)
+            augmenting_paths = _get_augmenting_paths_by_bases(adjacency, mates, disjoint=True, stats=stats, solver=solver, labels=parities, max_length=max_length)
+            if len(augmenting_paths) == 0:
+                return
+            for augmenting_path in augmenting_paths:
+                _augment_mates(mates, augmenting_path)
+                yield augmenting_path
+
+    matching = _get_maximum_matching_by(graph, matching, augment, stats, progress)
+    vertices = list(graph.get_vertices())
+    barrier = [vertices[v] for v, parity in enumerate(parities) if parity == _ODD]
+    bound = (len(vertices) + len(barrier) - _get_odd_component_count(graph, barrier)) // 2
+    size = len(matching.get_edges())
+    return matching, size / bound if bound > 0 else 1.0
+
+def get_matchings(graph, matching=None, engine=None, interval=1, stats=None, solver=None):
+
+    # Yields a copy of the matching every interval augmentations, and the maximum matching last.
+    if matching is None:
+        matching = _get_exposed_matching(graph)
+    matching = matching.copy()
+    augmentation_count = 0
+    for _ in _get_solve_steps(graph, matching, engine, None, stats, solver):
+        augmentation_count += 1
+        if augmentation_count % interval == 0:
+            yield matching.copy()
+    if augmentation_count % interval != 0 or augmentation_count == 0:
+        yield matching
+
+async def solve_async(graph, matching=None, engine=None, interval=1, edge_scan_interval=10000, progress=None, stats=None, solver=None):
+
+    # Control goes back to the event loop every interval augmentations and every edge_scan_interval edge scans within
+    # a search. Each of those also calls progress with the matching size and augmentation count so far. Cancelling the
+    # task stops at the next pause and returns the matching reached, which is valid, with a cancelled status.
+
+    if matching is None:
+        matching = _get_exposed_matching(graph)
+    matching = matching.copy()
+    size = len(matching.get_edges())
+    engine = ENGINE_FOREST if engine is None else engine
+    status = STATUS_MAXIMUM
+    guarantee = 1.0
+    augmentation_count = 0
+    try:
+        for step in _get_solve_steps(graph, matching, engine, edge_scan_interval, stats, solver):
+            if step:
+                augmentation_count += 1
+                if augmentation_count % interval != 0:
+                    continue
+            if progress is not None:
+                progress(size + augmentation_count, augmentation_count)
+            await asyncio.sleep(0)
+    except asyncio.CancelledError:
+        status = STATUS_CANCELLED
+        guarantee = None
+    return Solution(matching, None, engine, status, guarantee=guarantee)
+
+def _get_solve_steps(graph, matching, engine, edge_scan_interval, stats, solver):
+
+    # Runs the bases or forest engine on a matching in place, yielding True after every augmentation and False at
+    # every pause inside a search. The contract engine recurses into contracted graphs and has nowhere to pause.
+    engine = ENGINE_FOREST if engine is None else engine
+    assert engine == ENGINE_BASES or engine == ENGINE_FOREST, 'Engine must be bases or forest'
+    if solver is None:
+        solver = Solver()
+    labels, adjacency, mates = _index_any(graph, matching)
+    while True:
+        search = _search_by_bases(adjacency, mates, disjoint=engine == ENGINE_FOREST, stats=stats, solver=solver, edge_scan_interval=edge_scan_interval)
+        while True:
+            try:
+                next(search)
+            except StopIteration as stop:
+                augmenting_paths = stop.value
+                break
+            yield False
+        if len(augmenting_paths) == 0:
+            return
+        for augmenting_path in augmenting_paths:
+            _augment_mates(mates, augmenting_path)
+            if not isinstance(matching, CompactMatching):
+                matching.augment_in_place([labels[v] for v in augmenting_path])
+            if stats is not None:
+                stats.on_augment([labels[v] for v in augmenting_path])
+            yield True
+
+def solve_components(graph, matching=None, validation=None, engine=None, warm_start=True, seed=None, workers=None, chunk_edge_count=1000):
+    if validation is not None:
+        with validating(validation):
+            return solve_components(graph, matching, engine=engine, warm_start=warm_start, seed=seed, workers=workers, chunk_edge_count=chunk_edge_count)
+    if matching is None:
+        matching = _get_exposed_matching(graph)
+    labels, adjacency, mates = _index_any(graph, matching)
+    components = _get_components(adjacency)
+    tasks = [_get_component_task(adjacency, mates, component) for component in components]
+
+    # Components are grouped, largest first, into chunks of at least chunk_edge_count edges, each sent to a worker as
+    # one task, so that many small components make a few tasks rather than thousands of tiny ones. Every edge is two
+    # neighbor entries. Only when the whole graph fits in one chunk is it solved in place without a pool.
+
+    chunks = []
+    neighbor_count = 0
+    for i in sorted(range(len(tasks)), key=lambda i: -len(tasks[i][1])):
+        if len(chunks) == 0 or neighbor_count >= 2 * chunk_edge_count:
+            chunks.append([])
+            neighbor_count = 0
+        chunks[-1].append(i)
+        neighbor_count += len(tasks[i][1])
+    results = [None] * len(tasks)
+    if len(chunks) > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_solve_components, [tasks[i] for i in chunk], _validation.level, engine, warm_start, seed) for chunk in chunks]
+            for chunk, future in zip(chunks, futures):
+                for i, result in zip(chunk, future.result()):
+                    results[i] = result
+    else:
+        for i in range(len(tasks)):
+            results[i] = _solve_component(tasks[i], _validation.level, engine, warm_start, seed)
+    solved_mates = [-1] * len(labels)
+    warm_start_size = 0 if warm_start else None
+    engines = set()
+    for component, (component_mates, size, component_engine) in zip(components, results):
+        for v, w in zip(component, component_mates):
+            if w != -1:
+                solved_mates[v] = component[w]
+        if warm_start:
+            warm_start_size += size
+        engines.add(component_engine)
+    return Solution(_get_matching(graph, labels, solved_mates), warm_start_size, engines.pop() if len(engines) == 1 else None)
+
+def _get_component_task(adjacency, mates, component):
+    indices = {v: i for i, v in enumerate(component)}
+    offsets = array.array('i', [0])
+    neighbors = array.array('i')
+    for v in component:
+        neighbors.extend([indices[w] for w in adjacency[v]])
+        offsets.append(len(neighbors))
+    component_mates = array.array('i', [indices[mates[v]] if mates[v] != -1 else -1 for v in component])
+    return offsets, neighbors, component_mates
+
+def _solve_component(task, validation, engine, warm_start, seed):
+    offsets, neighbors, mates = task
+    with validating(validation):
+        graph = CompactGraph(offsets=offsets, neighbors=neighbors)
+        matching = CompactMatching(graph, mates)
+        solution = solve(graph, matching, engine=engine, warm_start=warm_start, seed=seed)
+        return solution.get_matching().mates, solution.get_warm_start_size(), solution.get_engine()
+
+def _solve_components(tasks, validation, engine, warm_start, seed):
+    return [_solve_component(task, validation, engine, warm_start, seed) for task in tasks]
+
+def _get_components(adjacency):
+    components = []
+    visited = [False] * len(adjacency)
+    for root in range(len(adjacency)):
+        if visited[root]:
+            continue
+        visited[root] = True
+        component = [root]
+        for v in component:
+            for w in adjacency[v]:
+                if not visited[w]:
+                    visited[w] = True
+                    component.append(w)
+        components.append(component)
+    return components
+
+# https://en.wikipedia.org/wiki/Maximal_matching
+# https://en.wikipedia.org/wiki/Gallai%E2%80%93Edmonds_decomposition
+def get_certificate(graph, matching):
+
+    # One more search from every exposed vertice labels the graph the way the last search of a solve ends. Even
+    # vertices can be reached from an exposed vertice by an even alternating path, odd vertices are their remaining
+    # neighbors, and nothing else is reached. If the search finds an augmenting path instead, there is no certificate.
+
+    labels, adjacency, mates = _index_any(graph, matching)
+    parities = [0] * len(adjacency)
+    if len(_get_augmenting_paths_by_bases(adjacency, mates, labels=parities)) > 0:
+        return None
+    vertices = {0: [], _EVEN: [], _ODD: []}
+    for v, parity in enumerate(parities):
+        vertices[parity].append(labels[v])
+    return Certificate(vertices[_EVEN], vertices[_ODD], vertices[0])
+
+# https://en.wikipedia.org/wiki/Tutte%E2%80%93Berge_formula
+def verify_certificate(graph, matching, certificate):
+
+    # No matching can cover more than (n + |A| - odd(G - A)) / 2 edges for any set A, where odd(G - A) counts the
+    # components of odd size left after removing A. A matching that reaches this bound with the odd vertices of the
+    # certificate as A is maximum. The check is one pass over the matching and one traversal of the graph.
+
+    vertices = graph.get_vertices()
+    contains = _get_contains(graph)
+    get_neighbors = _get_neighbors_getter(graph)
+    matched = set()
+    for v, w in matching.get_edges():
+        if not contains(v) or not contains(w):
+            return False
+        if v in matched or w in matched or w not in get_neighbors(v):
+            return False
+        matched.add(v)
+        matched.add(w)
+    barrier = set(certificate.get_odd_vertices())
+    if not all(contains(v) for v in barrier):
+        return False
+    return len(matched) == len(vertices) + len(barrier) - _get_odd_component_count(graph, barrier)
+
+def _get_contains(graph):
+    if isinstance(graph, CompactGraph):
+        return graph.indices.__contains__
+    return graph.adjacency.__contains__
+
+def _get_neighbors_getter(graph):
+    if isinstance(graph, CompactGraph):
+        return graph.get_neighbors
+    return graph.adjacency.__getitem__
+
+def _get_odd_component_count(graph, barrier):
+    get_neighbors = _get_neighbors_getter(graph)
+    visited = set(barrier)
+    odd_component_count = 0
+    for t in graph.get_vertices():
+        if t in visited:
+            continue
+        visited.add(t)
+        stack = [t]
+        size = 0
+        while len(stack) > 0:
+            u = stack.pop()
+            size += 1
+            for w in get_neighbors(u):
+                if w not in visited:
+                    visited.add(w)
+                    stack.append(w)
+        odd_component_count += size % 2
+    return odd_component_count
+
+def get_maximal_matching(graph, matching=None, seed=None):
+    if matching is None:
+        matching = _get_exposed_matching(graph)
+    matching = matching.copy()
+    labels, adjacency, mates = _index_any(graph, matching)
+    edges = _match_by_karp_sipser(adjacency, mates, random.Random(seed))
+    if isinstance(graph, CompactGraph):
+        return matching
+    for v, w in edges:
+        matching.augment_in_place([labels[v], labels[w]])
+    return matching
+
+# https://doi.org/10.1007/11538462_15
+def get_streaming_matching(edges, passes=None, epsilon=None):
+
+    # Only a mate per vertice is kept, plus the alternating forest of the current phase, so memory is linear in the
+    # vertices however long the stream is. The first pass builds a greedy maximal matching, which is at least half of
+    # maximum. Each phase after it grows an alternating tree from every exposed vertice as edges arrive, each vertice
+    # joining the first tree to reach it. An edge between even vertices of two trees closes an augmenting path, and both
+    # trees stop growing, so the paths of a phase are disjoint and are all augmented when it ends. After i passes every
+    # vertice at most i matched edges from an exposed vertice has been reached, so in a bipartite graph a phase of k + 1
+    # passes that finds nothing proves there is no augmenting path with k matched edges or fewer, which means at least
+    # (k + 1) / (k + 2) of maximum. A phase gets the passes for the smallest k within epsilon, and the phases stop once
+    # one finds nothing or the passes run out. In other graphs an odd cycle can hide a path from the forest, so there
+    # the bound is what the phases aim for rather than a promise. Epsilon defaults to a third. Edges are either an
+    # iterable that can be iterated once per pass or a function returning a fresh iterator per pass.
+    stream = edges if callable(edges) else lambda: edges
+    k = 1 if epsilon is None else max(1, math.ceil(1 / epsilon) - 2)
+    mates = {}
+    for v, w in stream():
+        if v == w:
+            continue
+        mates.setdefault(v, None)
+        mates.setdefault(w, None)
+        if mates[v] is None and mates[w] is None:
+            mates[v], mates[w] = w, v
+    pass_count = 0
+    while passes is None or pass_count < passes:
+        parents = {}
+        trees = {}
+        for v in mates:
+            if mates[v] is None:
+                parents[v] = None
+                trees[v] = v
+        done = set()
+        ends = []
+        for _ in range(k + 1):
+            if passes is not None and pass_count == passes:
+                break
+            pass_count += 1
+            grown = False
+            for v, w in stream():
+                for t, u in ((v, w), (w, v)):
+                    if t not in trees or trees[t] in done:
+                        continue
+                    if u in trees:
+                        if trees[u] == trees[t] or trees[u] in done:
+                            continue
+                        ends.append((t, u))
+                        done.add(trees[t])
+                        done.add(trees[u])
+                    elif u not in parents:
+                        x = mates[u]
+                        parents[u] = t
+                        parents[x] = u
+                        trees[x] = trees[t]
+                    else:
+                        continue
+                    grown = True
+                    break
+            if not grown:
+                break
+        if len(ends) == 0:
+            break
+        for t, u in ends:
+            path = [t]
+            while parents[path[-1]] is not None:
+                path.append(parents[path[-1]])
+            path.reverse()
+            path.append(u)
+            while parents[path[-1]] is not None:
+                path.append(parents[path[-1]])
+            for i in range(0, len(path), 2):
+                mates[path[i]], mates[path[i + 1]] = path[i + 1], path[i]
+    matching = Matching()
+    matching.add_vertices(mates.keys())
+    for v, w in mates.items():
+        if w is not None and (v, w) == tuple(sorted((v, w))):
+            matching.augment_in_place([v, w])
+    return matching
+
+def _get_exposed_matching(graph):
+    if isinstance(graph, CompactGraph):
+        return CompactMatching(graph)
+    matching = Matching()
+    matching.add_vertices(graph.get_vertices())
+    return matching
+
+def load_graph(edges, compact=False):
+    if numpy is not None and isinstance(edges, numpy.ndarray):
+        labels, sources, targets = _get_unique_edges(edges)
+        graph = _get_compact_graph(labels, sources, targets)
+        if compact:
+            return graph, CompactMatching(graph)
+        graph = graph.get_graph()
+        matching = Matching()
+        matching.add_vertices(graph.adjacency.keys())
+        return graph, matching
+    if compact:
+        graph = CompactGraph(edges)
+        return graph, CompactMatching(graph)
+    graph = Graph()
+    graph.add_edges(edges)
+    matching = Matching()
+    matching.add_vertices(graph.adjacency.keys())
+    return graph, matching
+
+def load_graph_file(path, binary=False, compact=False):
+
+    # Text files hold two whitespace separated integer labels per line and binary files hold pairs of native 32-bit
+    # integers. Either way the file is mapped rather than read. Text is parsed in chunks that end on a line break, so
+    # beyond the map and the edges only one chunk is held at a time. Binary labels are viewed in place with NumPy.
+    with open(path, 'rb') as file:
+        if not file.seek(0, 2):
+            return load_graph([], compact)
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            if not binary:
+                chunks = []
+                start = 0
+                while start < len(buffer):
+                    end = buffer.find(b'\n', min(start + _TEXT_CHUNK_SIZE, len(buffer)))
+                    end = len(buffer) if end == -1 else end + 1
+                    chunks.append(_parse_text_edges(buffer[start:end]))
+                    start = end
+                if numpy is not None:
+                    return load_graph(numpy.concatenate(chunks).reshape(-1, 2), compact)
+                return load_graph([edge for chunk in chunks for edge in chunk], compact)
+            if numpy is not None:
+                values = numpy.frombuffer(buffer, dtype=numpy.int32)
+                try:
+                    return load_graph(values.reshape(-1, 2), compact)
+                finally:
+                    del values
+            view = memoryview(buffer)
+            try:
+                values = view.cast('i')
+                try:
+                    return load_graph(zip(values[0::2].tolist(), values[1::2].tolist()), compact)
+                finally:
+                    values.release()
+            finally:
+                view.release()
+
+_TEXT_CHUNK_SIZE = 1 << 24
+
+def _parse_text_edges(chunk):
+
+    # With NumPy, the bytes are checked for stray characters and two labels per line, and then parsed by its separator
+    # parser in one call.
+    if numpy is None:
+        edges = []
+        for line in chunk.split(b'\n'):
+            tokens = line.split()
+            if len(tokens) == 0:
+                continue
+            assert len(tokens) == 2 and all(token.lstrip(b'-').isdigit() for token in tokens), 'Text file must hold two integer labels per line'
+            edges.append((int(tokens[0]), int(tokens[1])))
+        return edges
+    view = numpy.frombuffer(chunk, dtype=numpy.uint8)
+    spaces = (view == ord(' ')) | ((view >= ord('\t')) & (view <= ord('\r')))
+    digits = (view >= ord('0')) & (view <= ord('9'))
+    starts = ~spaces & numpy.concatenate(([True], spaces[:-1]))
+    signs = (view == ord('-')) & starts & numpy.concatenate((digits[1:], [False]))
+    assert (spaces | digits | signs).all(), 'Text file must hold two integer labels per line'
+    lines = numpy.searchsorted(numpy.flatnonzero(view == ord('\n')), numpy.flatnonzero(starts))
+    assert numpy.isin(numpy.bincount(lines), (0, 2)).all(), 'Text file must hold two integer labels per line'
+    values = numpy.fromstring(chunk, dtype=numpy.int64, sep=' ')
+    assert len(values) == numpy.count_nonzero(starts), 'Text file must hold two integer labels per line'
+    return values
+
+_GRAPH_MAGIC = b'BLSMGRPH'
+_MATCHING_MAGIC = b'BLSMMATE'
+
+def save_graph(graph, path):
+
+    # A graph snapshot is a magic string, three 64-bit counts and the CSR arrays of a compact graph in native byte
+    # order. Integer labels follow on an 8-byte boundary unless every label is its own index. Snapshots are written
+    # to a temporary file first and then moved over the path, so a crash never leaves a partial snapshot behind.
+    assert isinstance(graph, CompactGraph), 'Only compact graphs can be saved'
+    assert all(isinstance(label, int) and -2 ** 63 <= label < 2 ** 63 for label in graph.labels), 'Only graphs with 64-bit integer labels can be saved'
+    labelled = any(label != v for v, label in enumerate(graph.labels))
+    header = array.array('q', [len(graph.labels), len(graph.neighbors), int(labelled)])
+    padding = bytes(-(4 * (len(graph.offsets) + len(graph.neighbors))) % 8)
+    labels = array.array('q', graph.labels) if labelled else array.array('q')
+    _write_snapshot(path, (_GRAPH_MAGIC, header, graph.offsets, graph.neighbors, padding, labels))
+
+def save_matching(matching, path):
+    assert isinstance(matching, CompactMatching), 'Only compact matchings can be saved'
+    _write_snapshot(path, (_MATCHING_MAGIC, array.array('q', [len(matching.mates)]), matching.mates))
+
+def _write_snapshot(path, chunks):
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'wb') as file:
+        for chunk in chunks:
+            file.write(chunk)
+    os.replace(temporary_path, path)
+
+def load_graph_snapshot(path):
+
+    # The CSR arrays are views into the mapped file, so nothing is parsed or copied and pages load as the solve
+    # touches them. Only the labels, when there are any, are read into a list.
+    with open(path, 'rb') as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(buffer)
+    assert view[:8] == _GRAPH_MAGIC, 'File must be a graph snapshot'
+    n, neighbor_count, labelled = view[8:32].cast('q')
+    start = 32
+    offsets = view[start:start + 4 * (n + 1)].cast('i')
+    start += 4 * (n + 1)
+    neighbors = view[start:start + 4 * neighbor_count].cast('i')
+    start += 4 * neighbor_count
+    start += -start % 8
+    labels = view[start:start + 8 * n].cast('q').tolist() if labelled else None
+    graph = CompactGraph(offsets=offsets, neighbors=neighbors, labels=labels)
+    return graph, CompactMatching(graph)
+
+def load_matching_snapshot(path, graph):
+
+    # The mates are a view into a copy-on-write map of the file, so only the pages an augmentation writes to are
+    # copied and the snapshot itself is never changed.
+    with open(path, 'rb') as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+    view = memoryview(buffer)
+    assert view[:8] == _MATCHING_MAGIC, 'File must be a matching snapshot'
+    n, = view[8:16].cast('q')
+    assert n == len(graph), 'Matching snapshot must have one mate per vertice of the graph'
+    return CompactMatching(graph, view[16:16 + 4 * n].cast('i'))
+
+def _get_unique_edges(edges):
+
+    # Once labels are replaced by their rank each undirected edge packs into a single integer, which turns
+    # deduplication into a one-dimensional unique rather than a much slower row-wise one.
+    edges = numpy.asarray(edges)
+    assert edges.ndim == 2 and edges.shape[1] == 2, 'Edge array must have shape (m, 2)'
+    labels, indices = numpy.unique(edges[edges[:, 0] != edges[:, 1]], return_inverse=True)
+    indices = numpy.sort(indices.reshape(-1, 2).astype(numpy.int64), axis=1)
+    keys = numpy.unique(indices[:, 0] * len(labels) + indices[:, 1])
+    return labels, keys // len(labels), keys % len(labels)
+
+def _get_compact_graph(labels, sources, targets):
+    ends = numpy.concatenate((sources, targets))
+    order = numpy.argsort(ends, kind='stable')
+    offsets = numpy.zeros(len(labels) + 1, dtype=numpy.int32)
+    numpy.cumsum(numpy.bincount(ends, minlength=len(labels)), out=offsets[1:])
+    neighbors = numpy.concatenate((targets, sources))[order].astype(numpy.int32)
+    return CompactGraph(offsets=array.array('i', offsets.tobytes()), neighbors=array.array('i', neighbors.tobytes()), labels=labels.tolist())
+
+def score_matching(graph, edges):
+    return score_matchings(graph, [edges])
+
+def score_matchings(graph, matchings):
+
+    # Matchings are (k, 2) integer arrays of labels of a compact graph, and each is scored in the same vectorized
+    # passes. Every edge and its endpoints packs into a single integer, so membership is a sorted search and conflicts
+    # are repeated keys. Only matched edges found in the graph count towards covering their endpoints, which the low
+    # bit of each endpoint key records so that a single sort serves both counts.
+
+    assert numpy is not None, 'Scoring matchings requires NumPy'
+    n = len(graph)
+    matchings = [numpy.asarray(edges, dtype=numpy.int64).reshape(-1, 2) for edges in matchings]
+    sizes = numpy.array([len(edges) for edges in matchings], dtype=numpy.int64)
+    edges = numpy.concatenate(matchings) if len(matchings) > 0 else numpy.zeros((0, 2), dtype=numpy.int64)
+    batch = numpy.repeat(numpy.arange(len(matchings)), sizes)
+    indices = numpy.full(edges.shape, -1, dtype=numpy.int64)
+    graph_keys = numpy.zeros(0, dtype=numpy.int64)
+    if n > 0:
+        labels = numpy.asarray(graph.labels)
+        order = numpy.argsort(labels, kind='stable')
+        positions = numpy.minimum(numpy.searchsorted(labels[order], edges), n - 1)
+        found = labels[order][positions] == edges
+        indices[found] = order[positions[found]]
+        offsets = numpy.frombuffer(graph.offsets, dtype=numpy.int32).astype(numpy.int64)
+        neighbors = numpy.frombuffer(graph.neighbors, dtype=numpy.int32).astype(numpy.int64)
+        sources = numpy.repeat(numpy.arange(n, dtype=numpy.int64), numpy.diff(offsets))
+        forward = sources < neighbors
+        graph_keys = numpy.sort(sources[forward] * n + neighbors[forward])
+    lows, highs = indices.min(axis=1), indices.max(axis=1)
+    keys = lows * n + highs
+    existing = (lows >= 0) & (lows != highs)
+    if len(graph_keys) > 0:
+        positions = numpy.minimum(numpy.searchsorted(graph_keys, keys), len(graph_keys) - 1)
+        existing &= graph_keys[positions] == keys
+    else:
+        existing[:] = False
+    missing_edge_counts = numpy.bincount(batch[~existing], minlength=len(matchings))
+    vertices = indices.ravel()
+    known = vertices >= 0
+    vertice_keys = numpy.repeat(batch, 2)[known] * n + vertices[known]
+    vertice_keys = numpy.sort(2 * vertice_keys + ~numpy.repeat(existing, 2)[known])
+    vertice_batch = vertice_keys // (2 * max(n, 1))
+    first = numpy.ones(len(vertice_keys), dtype=bool)
+    first[1:] = vertice_keys[1:] // 2 != vertice_keys[:-1] // 2
+    conflict_counts = numpy.bincount(vertice_batch[~first], minlength=len(matchings))
+    covered = first & (vertice_keys % 2 == 0)
+    exposed_counts = n - numpy.bincount(vertice_batch[covered], minlength=len(matchings))
+    return MatchingScores(sizes, missing_edge_counts, conflict_counts, exposed_counts)
+
+# https://doi.org/10.1109/SFCS.1981.21
+def _match_by_karp_sipser(adjacency, mates, rng):
+
+    # Vertices leave the residual graph once matched. A residual vertex of degree one can always be matched to its only
+    # neighbor without losing optimality, so those go first, and otherwise a random residual edge is matched.
+
+    n = len(adjacency)
+    if any(w != -1 for w in mates):
+        degrees = [sum(1 for w in adjacency[v] if mates[w] == -1) if mates[v] == -1 else 0 for v in range(n)]
+    else:
+        degrees = [len(adjacency[v]) for v in range(n)]
+    pendants = [v for v in range(n) if degrees[v] == 1]
+    order = [v for v in range(n) if degrees[v] > 1]
+    rng.shuffle(order)
+    edges = []
+    while True:
+        if len(pendants) > 0:
+            v = pendants.pop()
+            if degrees[v] != 1:
+                continue
+        elif len(order) > 0:
+            v = order.pop()
+            if degrees[v] == 0:
+                continue
+        else:
+            return edges
+        neighbors = [w for w in adjacency[v] if mates[w] == -1]
+        w = neighbors[0] if len(neighbors) == 1 else neighbors[int(rng.random() * len(neighbors))]
+        mates[v] = w
+        mates[w] = v
+        edges.append((v, w))
+        degrees[v] = 0
+        degrees[w] = 0
+        for t in (neighbors, adjacency[w]):
+            for u in t:
+                if degrees[u] > 0:
+                    degrees[u] -= 1
+                    if degrees[u] == 1:
+                        pendants.append(u)
+
+def _get_engine(graph, engine):
+    if isinstance(graph, CompactGraph):
+        assert engine != ENGINE_CONTRACT, 'Compact graphs cannot be contracted'
+        return ENGINE_FOREST if engine is None else engine
+    return ENGINE_CONTRACT if engine is None else engine
+
+def _get_maximum_matching_by(graph, matching, augment, stats=None, progress=None):
+    matching = matching.copy()
+    labels, adjacency, mates = _index_any(graph, matching)
+    augmenting_paths = augment(adjacency, mates)
+    if progress is not None:
+        augmenting_paths = progress.limit(augmenting_paths, matching)
+    if stats is not None:
+        return _get_maximum_matching_observed(matching, labels, augmenting_paths, stats)
+    if isinstance(graph, CompactGraph):
+        for _ in augmenting_paths:
+            pass
+        return matching
+    for augmenting_path in augmenting_paths:
+        matching.augment_in_place([labels[v] for v in augmenting_path])
+    return matching
+
+def _get_maximum_matching_observed(matching, labels, augmenting_paths, stats):
+
+    # Time spent producing the next path counts as search, which for the index engines includes flipping the mates.
+    start = time.perf_counter()
+    for augmenting_path in augmenting_paths:
+        now = time.perf_counter()
+        stats.seconds['search'] += now - start
+        augmenting_path = [labels[v] for v in augmenting_path]
+        if not isinstance(matching, CompactMatching):
+            matching.augment_in_place(augmenting_path)
+        stats.on_augment(augmenting_path)
+        start = time.perf_counter()
+        stats.seconds['augment'] += start - now
+    stats.seconds['search'] += time.perf_counter() - start
+    return matching
+
+def _get_progress(matching, target_size, deadline, max_augmentations, checkpoint, checkpoint_interval):
+    if target_size is None and deadline is None and max_augmentations is None and checkpoint is None:
+        return None
+    return _Progress(len(matching.get_edges()), target_size, deadline, max_augmentations, checkpoint, checkpoint_interval)
+
+def _augment_by_bases(adjacency, mates, disjoint, stats=None, solver=None):
+    augmenting_paths = _get_augmenting_paths_by_bases(adjacency, mates, disjoint=disjoint, stats=stats, solver=solver)
+    while len(augmenting_paths) > 0:
+        for augmenting_path in augmenting_paths:
+            _augment_mates(mates, augmenting_path)
+            yield augmenting_path
+        augmenting_paths = _get_augmenting_paths_by_bases(adjacency, mates, disjoint=disjoint, stats=stats, solver=solver)
+
+def is_bipartite(graph):
+    return _get_indexed_colors(graph) is not None
+
+def _get_indexed_colors(graph):
+    if isinstance(graph, CompactGraph):
+        return _get_colors(graph, range(len(graph)), [-1] * len(graph))
+    colors = _get_colors(graph.adjacency, graph.get_vertices(), dict.fromkeys(graph.get_vertices(), -1))
+    return None if colors is None else [colors[t] for t in graph.get_vertices()]
+
+def _get_colors(adjacency, vertices, colors):
+    for root in vertices:
+        if colors[root] != -1:
+            continue
+        colors[root] = 0
+        queue = [root]
+        for v in queue:
+            color = 1 - colors[v]
+            for w in adjacency[v]:
+                if colors[w] == -1:
+                    colors[w] = color
+                    queue.append(w)
+                elif colors[w] != color:
+                    return None
+    return colors
+
+# https://en.wikipedia.org/wiki/Hopcroft%E2%80%93Karp_algorithm
+# https://doi.org/10.1137/100785788
+def _augment_by_hopcroft_karp(adjacency, mates, colors=None):
+
+    # Each phase layers the alternating graph breadth-first from every free left vertex. A first depth-first sweep takes
+    # a maximal set of vertex-disjoint shortest augmenting paths, which is what bounds the phase count by O(sqrt(V)). As
+    # in Duff and Wiberg's variant, a second sweep over the same layers then also takes longer paths that are still free.
+
+    n = len(adjacency)
+    if colors is None:
+        colors = _get_colors(adjacency, range(n), [-1] * n)
+    assert colors is not None, 'Graph must be bipartite'
+    lefts = [v for v in range(n) if colors[v] == 0]
+    while True:
+        distances = [-1] * n
+        queue = [v for v in lefts if mates[v] == -1]
+        for v in queue:
+            distances[v] = 0
+        limit = -1
+        for v in queue:
+            for w in adjacency[v]:
+                x = mates[w]
+                if x == -1:
+                    if limit == -1:
+                        limit = distances[v] + 1
+                elif distances[x] == -1:
+                    distances[x] = distances[v] + 1
+                    queue.append(x)
+        if limit == -1:
+            return
+        dead = [0] * n
+        for sweep in (1, 2):
+            for root in lefts:
+                if mates[root] != -1 or dead[root] == sweep:
+                    continue
+                path = [root]
+                stack = [iter(adjacency[root])]
+                while len(stack) > 0:
+                    v = path[-1]
+                    for w in stack[-1]:
+                        x = mates[w]
+                        if x == -1:
+                            if sweep == 2 or distances[v] + 1 == limit:
+                                path.append(w)
+                                break
+                        elif distances[x] == distances[v] + 1 and dead[x] != sweep:
+                            path.append(w)
+                            path.append(x)
+                            stack.append(iter(adjacency[x]))
+                            break
+                    else:
+                        dead[v] = sweep
+                        del path[-2:]
+                        stack.pop()
+                        continue
+                    if mates[path[-1]] == -1:
+                        _augment_mates(mates, path)
+                        yield path
+                        break
+
+def _index(graph, matching):
+    labels = list(graph.get_vertices())
+    indices = {t: i for i, t in enumerate(labels)}
+    adjacency = [[indices[u] for u in graph.adjacency[t]] for t in labels]
+    mates = [-1] * len(labels)
+    for v, w in matching.get_edges():
+        mates[indices[v]] = indices[w]
+        mates[indices[w]] = indices[v]
+    return labels, adjacency, mates
+
+def _index_any(graph, matching):
+    if isinstance(graph, CompactGraph):
+        return graph.labels, graph, matching.mates
+    return _index(graph, matching)
+
+def _get_matching(graph, labels, mates, vertices=None):
+
+    # Builds the matching of graph that pairs labels[v] with labels[mates[v]]. Vertices default to the labels, and
+    # are given where some labels are unused.
+
+    if isinstance(graph, CompactGraph):
+        return CompactMatching(graph, array.array('i', mates))
+    matching = Matching()
+    matching.add_vertices(labels if vertices is None else vertices)
+    for v, w in enumerate(mates):
+        if v < w:
+            matching.augment_in_place([labels[v], labels[w]])
+    return matching
+
+def _augment_mates(mates, path):
+    for i in range(0, len(path), 2):
+        v, w = path[i], path[i+1]
+        mates[v] = w
+        mates[w] = v
+
+def _get_augmenting_paths_by_bases(adjacency, mates, roots=None, disjoint=False, stats=None, solver=None, labels=None, max_length=None):
+    search = _search_by_bases(adjacency, mates, roots, disjoint, stats, solver, labels, max_length)
+    try:
+        next(search)
+    except StopIteration as stop:
+        return stop.value
+    assert False, 'Search must not pause without an edge scan interval'
+
+# https://codeforces.com/blog/entry/92339
+def _search_by_bases(adjacency, mates, roots=None, disjoint=False, stats=None, solver=None, labels=None, max_length=None, edge_scan_interval=None):
+
+    # Blossoms are never materialized. Every vertex carries the base of the outermost blossom containing it, kept in
+    # a union-find, and the alternating forest keeps growing after each contraction. Even vertices walk towards their
+    # root through their mate and then the parent of that mate. Contracting a blossom points the parents of its even
+    # vertices across the cycle, so the same walk from any blossom vertex reaches the base by an even-length route.
+
+    # With disjoint set, every root grows breadth-first at once in one forest, and the two trees joined by each
+    # augmenting path are retired instead of ending the search. The paths found are vertex-disjoint and can be
+    # augmented together, and a search that finds nothing is complete, so the matching is then maximum. The paths are
+    # not kept shortest and the set is not maximal among shortest paths, so unlike a Hopcroft-Karp phase this gives no
+    # better bound than O(V E): at worst every search yields a single path. It only cuts the search count in practice.
+
+    # With max_length set, even vertices no closer to their root than max_length are not scanned. Distances are exact
+    # along tree edges, while a vertex that turns even inside a blossom gets the length of the route around the edge
+    # that closed it as an upper bound. A pruned search that finds nothing no longer proves the matching maximum.
+
+    # The search is a generator returning its augmenting paths. With edge_scan_interval set, it pauses every time that
+    # many more edges have been scanned, yielding the count so far, so that a caller can hand control back in between.
+
+    # The per-vertex lists come from the session's scratch and are cleaned and handed back when the search ends. The
+    # queue keeps every vertex that turned even, so with their mates and the exposed ends of augmenting paths it holds
+    # all the forest touched, and a search costs the forest it grows rather than the whole graph. A search abandoned
+    # part way never hands its scratch back, so the next one starts from fresh lists.
+
+    n = len(adjacency)
+    scratch = _Scratch(n) if solver is None else solver.get_scratch(n)
+    if labels is None:
+        labels = scratch.labels
+    parents = scratch.parents
+    trees = scratch.trees
+    links = scratch.links
+    stamps = scratch.stamps
+    stamp = scratch.stamp
+    depths = scratch.depths if stats is not None else None
+    distances = scratch.distances if max_length is not None else None
+    ends = []
+    retired = set()
+    augmenting_paths = []
+    edge_scan_count = 0
+    pause_count = edge_scan_interval
+
+    def find(v):
+        while links[v] != v:
+            links[v] = links[links[v]]
+            v = links[v]
+        return v
+
+    def get_path_to_root(v):
+        path = []
+        while True:
+            path.append(v)
+            w = mates[v]
+            if w == -1:
+                return path
+            path.append(w)
+            v = parents[w]
+
+    def get_common_ancestor(v, w):
+        v, w = find(v), find(w)
+        while True:
+            if v != -1:
+                if stamps[v] == stamp:
+                    return v
+                stamps[v] = stamp
+                v = find(parents[mates[v]]) if mates[v] != -1 else -1
+            v, w = w, v
+
+    def contract(v, child, base, cycle, distance):
+        while find(v) != base:
+            w = mates[v]
+            if labels[w] == _ODD:
+                labels[w] = _EVEN
+                if distances is not None:
+                    distances[w] = distance
+                queue.append(w)
+            parents[v] = child
+            cycle.append(v)
+            cycle.append(w)
+            child = w
+            v = parents[w]
+
+    queue = []
+    head = 0
+    if roots is None:
+        roots = [v for v in range(n) if mates[v] == -1]
+    for v in roots:
+        labels[v] = _EVEN
+        trees[v] = v
+        queue.append(v)
+    while head < len(queue):
+        v = queue[head]
+        head += 1
+        if trees[v] in retired:
+            continue
+        if distances is not None and distances[v] >= max_length:
+            continue
+        if stats is not None or edge_scan_interval is not None:
+            edge_scan_count += len(adjacency[v])
+            if edge_scan_interval is not None and edge_scan_count >= pause_count:
+                pause_count = edge_scan_count + edge_scan_interval
+                yield edge_scan_count
+        for w in adjacency[v]:
+            if mates[v] == w or find(v) == find(w) or trees[w] in retired:
+                continue
+            if labels[w] == 0:
+                if mates[w] == -1:
+                    augmenting_paths.append(list(reversed(get_path_to_root(v))) + [w])
+                    labels[w] = _EVEN
+                    trees[w] = trees[v]
+                    ends.append(w)
+                    retired.add(trees[v])
+                    if not disjoint:
+                        head = len(queue)
+                    break
+                labels[w] = _ODD
+                parents[w] = v
+                trees[w] = trees[v]
+                x = mates[w]
+                labels[x] = _EVEN
+                trees[x] = trees[v]
+                if distances is not None:
+                    distances[w] = distances[v] + 1
+                    distances[x] = distances[v] + 2
+                queue.append(x)
+            elif labels[w] == _EVEN:
+                if trees[v] != trees[w]:
+                    augmenting_paths.append(list(reversed(get_path_to_root(v))) + get_path_to_root(w))
+                    retired.add(trees[v])
+                    retired.add(trees[w])
+                    if not disjoint:
+                        head = len(queue)
+                    break
+                stamp += 1
+                base = get_common_ancestor(v, w)
+                cycle = []
+                distance = distances[v] + distances[w] + 1 if distances is not None else None
+                contract(v, w, base, cycle, distance)
+                contract(w, v, base, cycle, distance)
+                if stats is not None:
+                    merged = set(find(t) for t in cycle)
+                    merged.add(base)
+                    depths[base] = 1 + max(depths[t] for t in merged)
+                    stats.on_blossom(len(merged), depths[base])
+                # Merging waits until both walks are done, since a walk crossing an inner blossom has to see that
+                # blossom's own base to find its way out.
+                for t in cycle:
+                    links[find(t)] = find(base)
+    if stats is not None:
+        stats.on_search(len(set(queue).union(mates[v] for v in queue if mates[v] != -1)) + len(ends), edge_scan_count)
+    scratch.stamp = stamp
+    if 8 * len(queue) > len(scratch):
+        scratch.clear(labels is scratch.labels)
+    else:
+        ends.extend(queue)
+        ends.extend([mates[v] for v in queue if mates[v] != -1])
+        scratch.reset(ends, labels is scratch.labels)
+    if solver is not None:
+        solver.put_scratch(scratch)
+    return augmenting_paths
+
+_EVEN = 1
+_ODD = 2
+
 class Graph:
 
     def __init__(self):
         self.adjacency = {}
-        self.unmarked_adjacency = {}
         self.__assert_representation()
 
     def __assert_representation(self):
+        if _validation.level < VALIDATION_FULL:
+            return
         for t in self.adjacency:
             assert len(self.adjacency[t]) > 0, 'If vertice exists in adjacency matrix, it must have at least one neighbor'
             for u in self.adjacency[t]:
                 self.__assert_edge_exists((t, u))
-        for t in self.unmarked_adjacency:
-            assert len(self.unmarked_adjacency[t]) > 0, 'If vertice exists in unmarked adjacency matrix, it must have at least one neighbor'
-            for u in self.unmarked_adjacency[t]:
-                self.__assert_edge_exists((t, u))
-                self.__assert_unmarked_edge_exists((t, u))
 
     def __assert_edge_exists(self, edge):
+        if _validation.level < VALIDATION_LOCAL:
+            return
         v, w = edge
         assert (v in self.adjacency) and (w in self.adjacency[v]), 'Edge must exist in adjacency matrix'
         assert (w in self.adjacency) and (v in self.adjacency[w]), 'Reciprocal edge must exist in adjacency matrix'
 
     def __assert_edge_does_not_exist(self, edge):
+        if _validation.level < VALIDATION_LOCAL:
+            return
         v, w = edge
         assert (v not in self.adjacency) or (w not in self.adjacency[v]), 'Edge must not exist in adjacency matrix'
         assert (w not in self.adjacency) or (v not in self.adjacency[w]), 'Reciprocal edge must not exist in adjacency matrix'
 
-    def __assert_unmarked_edge_exists(self, edge):
-        v, w = edge
-        assert (v in self.unmarked_adjacency) and (w in self.unmarked_adjacency[v]), 'Edge must exist in unmarked adjacency matrix'
-        assert (w in self.unmarked_adjacency) and (v in self.unmarked_adjacency[w]), 'Reciprocal edge must exist in unmarked adjacency matrix'
-
-    def __assert_unmarked_edge_does_not_exist(self, edge):
-        v, w = edge
-        assert (v not in self.unmarked_adjacency) or (w not in self.unmarked_adjacency[v]), 'Edge must not exist in unmarked adjacency matrix'
-        assert (w not in self.unmarked_adjacency) or (v not in self.unmarked_adjacency[w]), 'Reciprocal edge must not exist in unmarked adjacency matrix'
-
     def __assert_vertice_exists(self, vertice):
+        if _validation.level < VALIDATION_LOCAL:
+            return
         assert vertice in self.adjacency, 'Vertice must exist in adjacency matrix'
 
     def __assert_vertice_does_not_exist(self, vertice):
+        if _validation.level < VALIDATION_LOCAL:
+            return
         assert vertice not in self.adjacency, 'Vertice must not exist in adjacency matrix'
-        assert vertice not in self.unmarked_adjacency, 'Vertice must not exist in unmarked adjacency matrix'
 
     def copy(self):
         self.__assert_representation()
@@ -94,16 +1207,11 @@ class Graph:
             graph.adjacency[t] = set()
             for u in self.adjacency[t]:
                 graph.adjacency[t].add(u)
-        for t in self.unmarked_adjacency:
-            graph.unmarked_adjacency[t] = set()
-            for u in self.unmarked_adjacency[t]:
-                graph.unmarked_adjacency[t].add(u)
         graph.__assert_representation()
         return graph
 
     def add_edge(self, edge):
         self.__assert_edge_does_not_exist(edge)
-        self.__assert_unmarked_edge_does_not_exist(edge)
         v, w = edge
         if v not in self.adjacency:
             self.adjacency[v] = set()
@@ -111,46 +1219,22 @@ class Graph:
         if w not in self.adjacency:
             self.adjacency[w] = set()
         self.adjacency[w].add(v)
-        if v not in self.unmarked_adjacency:
-            self.unmarked_adjacency[v] = set()
-        self.unmarked_adjacency[v].add(w)
-        if w not in self.unmarked_adjacency:
-            self.unmarked_adjacency[w] = set()
-        self.unmarked_adjacency[w].add(v)
         self.__assert_representation()
 
-    def unmark_all_edges(self):
-        self.unmarked_adjacency = {}
-        for t in self.adjacency:
-            self.unmarked_adjacency[t] = set()
-            for u in self.adjacency[t]:
-                self.unmarked_adjacency[t].add(u)
-        self.__assert_representation()
-
-    def mark_edges(self, edges):
-        for edge in edges:
-            self.mark_edge(edge)
+    def add_edges(self, edges):
+
+        # Self-loops and repeated edges are dropped rather than asserted against, and the representation is checked
+        # once at the end instead of once per edge.
+        adjacency = self.adjacency
+        for v, w in edges:
+            if v == w:
+                continue
+            for t, u in ((v, w), (w, v)):
+                if t not in adjacency:
+                    adjacency[t] = set()
+                adjacency[t].add(u)
         self.__assert_representation()
 
-    def mark_edge(self, edge):
-        self.__assert_edge_exists(edge)
-        self.__assert_unmarked_edge_exists(edge)
-        v, w = edge
-        self.unmarked_adjacency[v].remove(w)
-        if len(self.unmarked_adjacency[v]) == 0:
-            del self.unmarked_adjacency[v]
-        self.unmarked_adjacency[w].remove(v)
-        if len(self.unmarked_adjacency[w]) == 0:
-            del self.unmarked_adjacency[w]
-        self.__assert_representation()
-
-    def get_unmarked_neighboring_edge(self, vertice):
-        self.__assert_representation()
-        if vertice in self.unmarked_adjacency:
-            return vertice, next(iter(self.unmarked_adjacency[vertice]))
-        else:
-            return None
-    
     def get_vertices(self):
         self.__assert_representation()
         return self.adjacency.keys()
@@ -167,11 +1251,11 @@ class Graph:
                 if u != blossom.get_id():
                     graph.adjacency[blossom.get_id()].add(u)
                     graph.adjacency[u].add(blossom.get_id())
+                    blossom.set_entry(u, t)
             del graph.adjacency[t]
         if len(graph.adjacency[blossom.get_id()]) == 0:
             # Required to maintain invariant
             del graph.adjacency[blossom.get_id()]
-        graph.unmark_all_edges()
         graph.__assert_representation()
         return graph
 
@@ -199,18 +1283,9 @@ class Graph:
             #        o                # |      b               
             #    b                    #  `-o                   
 
-            w = path[1]
-            blossom_path = []
-            for v in blossom.traverse_left():
-                blossom_path.append(v)
-                if (w in self.adjacency[v]) and (len(blossom_path) % 2 != 0):
-                    return blossom_path + path[1:]
-            blossom_path = []
-            for v in blossom.traverse_right():
-                blossom_path.append(v)
-                if (w in self.adjacency[v]) and (len(blossom_path) % 2 != 0):
-                    return blossom_path + path[1:]
-            assert False, 'At least one path with even edges must exist through the blossom'
+            lifted = blossom.get_path_to(self.__get_entry(blossom, path[1]))
+            lifted.extend(path[1:])
+            return lifted
         if path[-1] == blossom.get_id():
 
             ############################################################################################################
@@ -229,83 +1304,69 @@ class Graph:
             #                o        #                b      |
             #                    b    #                    o-' 
 
-            u = path[-2]
-            blossom_path = []
-            for v in blossom.traverse_left():
-                blossom_path.append(v)
-                if (u in self.adjacency[v]) and (len(blossom_path) % 2 != 0):
-                    return path[:-1] + list(reversed(blossom_path))
-            blossom_path = []
-            for v in blossom.traverse_right():
-                blossom_path.append(v)
-                if (u in self.adjacency[v]) and (len(blossom_path) % 2 != 0):
-                    return path[:-1] + list(reversed(blossom_path))
-            assert False, 'At least one path with even edges must exist through the blossom'
-        for i, v in enumerate(path):
-            if v == blossom.get_id():
-                u, w = path[i-1], path[i+1]
-                if u in self.adjacency[blossom.get_base()]:
-
-                    ####################################################################################################
-                    # INTERIOR LEFT-ORIENTED BLOSSOM
-                    ####################################################################################################
-
-                    #            o     #                         #                         #          o--,  
-                    #                  #                         #                         #              o
-                    #            o     #                         #                         # o  o--b        
-                    #            |     #          o--,           #          o--,           #              o 
-                    #            o     #              o  o--o  o #              o          #          o--'  
-                    #                  # o  o--b                 # o  o--b                 #                
-                    #            o--,  #              o          #              o  o--o  o #          o     
-                    #                o #          o--'           #          o--'           #          |     
-                    #   o  o--b        #                         #                         #          o    
-                    #                o #                         #                         #               
-                    #            o--'  #                         #                         #          o    
-
-                    blossom_path = []
-                    for v in blossom.traverse_left():
-                        blossom_path.append(v)
-                        if (w in self.adjacency[v]) and (len(blossom_path) % 2 != 0):
-                            return path[:i] + blossom_path + path[i+1:]
-                    blossom_path = []
-                    for v in blossom.traverse_right():
-                        blossom_path.append(v)
-                        if (w in self.adjacency[v]) and (len(blossom_path) % 2 != 0):
-                            return path[:i] + blossom_path + path[i+1:]
-                    assert False, 'At least one path with even edges must exist through the blossom'
-                elif w in self.adjacency[blossom.get_base()]:
-
-                    ####################################################################################################
-                    # INTERIOR RIGHT-ORIENTED BLOSSOM
-                    ####################################################################################################
-
-                    #       o          #                         #                         #  ,--o         
-                    #                  #                         #                         # o             
-                    #       o          #                         #                         #        b--o  o
-                    #       |          #           ,--o          #           ,--o          # o             
-                    #       o          # o  o--o  o              #          o              #  `--o         
-                    #                  #                 b--o  o #                 b--o  o #               
-                    #    ,--o          #          o              # o  o--o  o              #     o         
-                    #   o              #           `--o          #           `--o          #     |         
-                    #          b--o  o #                         #                         #     o         
-                    #   o              #                         #                         #               
-                    #    `--o          #                         #                         #     o         
-
-                    blossom_path = []
-                    for v in blossom.traverse_left():
-                        blossom_path.append(v)
-                        if (u in self.adjacency[v]) and (len(blossom_path) % 2 != 0):
-                            return path[:i] + list(reversed(blossom_path)) + path[i+1:]
-                    blossom_path = []
-                    for v in blossom.traverse_right():
-                        blossom_path.append(v)
-                        if (u in self.adjacency[v]) and (len(blossom_path) % 2 != 0):
-                            return path[:i] + list(reversed(blossom_path)) + path[i+1:]
-                    assert False, 'At least one path with even edges must exist through the blossom'
-                else:
-                    assert False, 'Exactly one side of the path must be incident to the base of the blossom'
+            lifted = path[:-1]
+            lifted.extend(reversed(blossom.get_path_to(self.__get_entry(blossom, path[-2]))))
+            return lifted
+        if blossom.get_id() in path:
+            i = path.index(blossom.get_id())
+            u, w = path[i-1], path[i+1]
+            if u in self.adjacency[blossom.get_base()]:
+
+                ########################################################################################################
+                # INTERIOR LEFT-ORIENTED BLOSSOM
+                ########################################################################################################
+
+                #            o     #                         #                         #          o--,  
+                #                  #                         #                         #              o
+                #            o     #                         #                         # o  o--b        
+                #            |     #          o--,           #          o--,           #              o 
+                #            o     #              o  o--o  o #              o          #          o--'  
+                #                  # o  o--b                 # o  o--b                 #                
+                #            o--,  #              o          #              o  o--o  o #          o     
+                #                o #          o--'           #          o--'           #          |     
+                #   o  o--b        #                         #                         #          o    
+                #                o #                         #                         #               
+                #            o--'  #                         #                         #          o    
+
+                lifted = list(path)
+                lifted[i:i + 1] = blossom.get_path_to(self.__get_entry(blossom, w))
+                return lifted
+            elif w in self.adjacency[blossom.get_base()]:
+
+                ########################################################################################################
+                # INTERIOR RIGHT-ORIENTED BLOSSOM
+                ########################################################################################################
+
+                #       o          #                         #                         #  ,--o         
+                #                  #                         #                         # o             
+                #       o          #                         #                         #        b--o  o
+                #       |          #           ,--o          #           ,--o          # o             
+                #       o          # o  o--o  o              #          o              #  `--o         
+                #                  #                 b--o  o #                 b--o  o #               
+                #    ,--o          #          o              # o  o--o  o              #     o         
+                #   o              #           `--o          #           `--o          #     |         
+                #          b--o  o #                         #                         #     o         
+                #   o              #                         #                         #               
+                #    `--o          #                         #                         #     o         
+
+                lifted = list(path)
+                lifted[i:i + 1] = reversed(blossom.get_path_to(self.__get_entry(blossom, u)))
+                return lifted
+            else:
+                assert False, 'Exactly one side of the path must be incident to the base of the blossom'
         return path
 
+    def __get_entry(self, blossom, vertice):
+
+        # The base is preferred, since a neighbor of the base may be its mate and must then enter there.
+        if vertice in self.adjacency[blossom.get_base()]:
+            return blossom.get_base()
+        entry = blossom.get_entry(vertice)
+        if entry is None:
+            entry = next((t for t in self.adjacency[vertice] if blossom.does_contain_vertice(t)), None)
+        assert entry is not None, 'Vertice must neighbor the blossom'
+        return entry
+
 class Matching:
 
     def __init__(self):
@@ -315,6 +1376,8 @@ class Matching:
         self.__assert_representation()
 
     def __assert_representation(self):
+        if _validation.level < VALIDATION_FULL:
+            return
         for t in self.adjacency:
             self.__assert_vertice_exists(t)
             if len(self.adjacency[t]) == 0:
@@ -326,28 +1389,38 @@ class Matching:
                 self.__assert_vertice_is_not_exposed(u)
 
     def __assert_edge_exists(self, edge):
+        if _validation.level < VALIDATION_LOCAL:
+            return
         v, w = edge
         assert (v in self.adjacency) and (w in self.adjacency[v]), 'Edge must exist in adjacency matrix'
         assert (w in self.adjacency) and (v in self.adjacency[w]), 'Reciprocal edge must exist in adjacency matrix'
         assert edge in self.edges, 'Edge must exist in edges set'
 
     def __assert_edge_does_not_exist(self, edge):
+        if _validation.level < VALIDATION_LOCAL:
+            return
         v, w = edge
         assert (v not in self.adjacency) or (w not in self.adjacency[v]), 'Edge must not exist in adjacency matrix'
         assert (w not in self.adjacency) or (v not in self.adjacency[w]), 'Reciprocal edge must not exist in adjacency matrix'
         assert edge not in self.edges, 'Edge must not exist in edges set'
 
     def __assert_vertice_is_exposed(self, vertice):
+        if _validation.level < VALIDATION_LOCAL:
+            return
         assert vertice in self.adjacency, 'Vertice must exist in adjacency matrix'
         assert vertice in self.exposed_vertices, 'Vertice must exist in exposed vertices set'
         assert len(self.adjacency[vertice]) == 0, 'Vertice must have no neighbors'
 
     def __assert_vertice_is_not_exposed(self, vertice):
+        if _validation.level < VALIDATION_LOCAL:
+            return
         assert vertice in self.adjacency, 'Vertice must exist in adjacency matrix'
         assert vertice not in self.exposed_vertices, 'Vertice must not exist in exposed vertices set'
         assert len(self.adjacency[vertice]) == 1, 'Vertice must have exactly one neighbor'
 
     def __assert_vertice_exists(self, vertice):
+        if _validation.level < VALIDATION_LOCAL:
+            return
         assert vertice in self.adjacency, 'Vertice must exist in adjacency matrix'
         if vertice in self.exposed_vertices:
             assert len(self.adjacency[vertice]) == 0, 'If vertice is exposed, it must have no neighbors'
@@ -355,6 +1428,8 @@ class Matching:
             assert len(self.adjacency[vertice]) == 1, 'If vertice is not exposed, it must have exactly one neighbor'
 
     def __assert_vertice_does_not_exist(self, vertice):
+        if _validation.level < VALIDATION_LOCAL:
+            return
         assert vertice not in self.adjacency, 'Vertice must not exist in adjacency matrix'
         assert vertice not in self.exposed_vertices, 'Vertice must not be exposed'
 
@@ -374,25 +1449,28 @@ class Matching:
 
     def augment(self, path):
         matching = self.copy()
-        matching.__assert_vertice_is_exposed(path[0])
-        matching.__assert_vertice_is_exposed(path[-1])
-        matching.exposed_vertices.remove(path[0])
-        matching.exposed_vertices.remove(path[-1])
+        matching.augment_in_place(path)
+        return matching
+
+    def augment_in_place(self, path):
+        self.__assert_vertice_is_exposed(path[0])
+        self.__assert_vertice_is_exposed(path[-1])
+        self.exposed_vertices.remove(path[0])
+        self.exposed_vertices.remove(path[-1])
         for i in range(len(path)-1):
             v, w = path[i], path[i+1]
             edge = tuple(sorted((v, w)))
-            if edge in matching.edges:
-                matching.__assert_edge_exists(edge)
-                matching.edges.remove(edge)
-                matching.adjacency[v].remove(w)
-                matching.adjacency[w].remove(v)
+            if edge in self.edges:
+                self.__assert_edge_exists(edge)
+                self.edges.remove(edge)
+                self.adjacency[v].remove(w)
+                self.adjacency[w].remove(v)
             else:
-                matching.__assert_edge_does_not_exist(edge)
-                matching.edges.add(edge)
-                matching.adjacency[v].add(w)
-                matching.adjacency[w].add(v)
-        matching.__assert_representation()
-        return matching
+                self.__assert_edge_does_not_exist(edge)
+                self.edges.add(edge)
+                self.adjacency[v].add(w)
+                self.adjacency[w].add(v)
+        self.__assert_representation()
 
     def get_edges(self):
         self.__assert_representation()
@@ -408,8 +1486,11 @@ class Matching:
         return next(iter(self.adjacency[vertice]))
 
     def add_vertices(self, vertices):
-        for vertice in vertices:
-            self.add_vertice(vertice)
+        vertices = set(vertices)
+        if _validation.level >= VALIDATION_LOCAL:
+            assert vertices.isdisjoint(self.adjacency), 'Vertice must not exist in adjacency matrix'
+        self.adjacency.update((vertice, set()) for vertice in vertices)
+        self.exposed_vertices.update(vertices)
         self.__assert_representation()
 
     def add_vertice(self, vertice):
@@ -442,77 +1523,108 @@ class Matching:
 
 class Forest:
 
+    # Vertices get a slot in order of insertion, and parents, roots and distances to root are kept per slot in flat
+    # lists. Stamps mark the slots visited while looking for the common ancestor of a blossom, one stamp per lookup.
+    # Even vertices are handed out in slot order from a cursor, so a search visits them in the same order every time.
+
+    __slots__ = ('indices', 'labels', 'parents', 'roots', 'distances', 'stamps', 'stamp', 'marked', 'cursor')
+
     def __init__(self):
-        self.roots = {}
-        self.distances_to_root = {}
-        self.unmarked_even_vertices = set()
-        self.parents = {}
+        self.indices = {}
+        self.labels = []
+        self.parents = []
+        self.roots = []
+        self.distances = []
+        self.stamps = []
+        self.stamp = 0
+        self.marked = []
+        self.cursor = 0
         self.__assert_representation()
 
     def __assert_representation(self):
-        for vertice in self.roots:
+        if _validation.level < VALIDATION_FULL:
+            return
+        assert len(self.indices) == len(self.labels), 'Indices and labels must have same size'
+        assert len(self.labels) == len(self.parents) == len(self.roots) == len(self.distances) == len(self.stamps) == len(self.marked), 'Per vertice lists must have same size'
+        for vertice in self.indices:
             self.__assert_vertice_exists(vertice)
-        assert self.roots.keys() == self.distances_to_root.keys(), 'Roots and distances to root must have same keys'
-        assert self.roots.keys() == self.parents.keys(), 'Roots and parents mut have same keys'
-        for vertice in self.unmarked_even_vertices:
-            self.__assert_vertice_exists(vertice)
-            assert self.distances_to_root[vertice] % 2 == 0, 'Unmarked even vertice must have even distance to root'
+            i = self.indices[vertice]
+            assert self.labels[i] == vertice, 'Indices and labels must be inverse'
+            if self.parents[i] == i:
+                assert self.roots[i] == i and self.distances[i] == 0, 'Root must be its own parent at distance zero'
+            else:
+                assert self.roots[i] == self.roots[self.parents[i]], 'Vertice must share its root with its parent'
+                assert self.distances[i] == 1 + self.distances[self.parents[i]], 'Vertice must be one further from root than its parent'
+        for i in range(self.cursor):
+            assert self.marked[i] or self.distances[i] % 2 != 0, 'Every even vertice before the cursor must be marked'
 
     def __assert_vertice_exists(self, vertice):
-        assert vertice in self.roots, 'Vertice must have a root'
-        assert vertice in self.distances_to_root, 'Vertice must have a distance to root'
-        assert vertice in self.parents, 'Vertice must have a parent'
+        if _validation.level < VALIDATION_LOCAL:
+            return
+        assert vertice in self.indices, 'Vertice must exist in forest'
 
     def __assert_vertice_does_not_exist(self, vertice):
-        assert vertice not in self.roots, 'Vertice must not have a root'
-        assert vertice not in self.distances_to_root, 'Vertice must not have a distance to root'
-        assert vertice not in self.unmarked_even_vertices, 'Vertice must not exist in unmarked even vertices set'
-        assert vertice not in self.parents, 'Vertice must not have a parent'
+        if _validation.level < VALIDATION_LOCAL:
+            return
+        assert vertice not in self.indices, 'Vertice must not exist in forest'
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __add_vertice(self, vertice, parent):
+        i = len(self.labels)
+        self.indices[vertice] = i
+        self.labels.append(vertice)
+        self.stamps.append(0)
+        self.marked.append(False)
+        if parent is None:
+            self.parents.append(i)
+            self.roots.append(i)
+            self.distances.append(0)
+        else:
+            self.parents.append(parent)
+            self.roots.append(self.roots[parent])
+            self.distances.append(1 + self.distances[parent])
 
     def add_singleton_tree(self, vertice):
         self.__assert_vertice_does_not_exist(vertice)
-        self.roots[vertice] = vertice
-        self.distances_to_root[vertice] = 0
-        self.unmarked_even_vertices.add(vertice)
-        self.parents[vertice] = vertice
+        self.__add_vertice(vertice, None)
         self.__assert_representation()
 
     def get_unmarked_even_vertice(self):
         self.__assert_representation()
-        if len(self.unmarked_even_vertices) > 0:
-            return next(iter(self.unmarked_even_vertices))
+        marked, distances = self.marked, self.distances
+        i = self.cursor
+        while i < len(marked) and (marked[i] or distances[i] % 2 != 0):
+            i += 1
+        self.cursor = i
+        if i < len(marked):
+            return self.labels[i]
         else:
             return None
 
     def mark_vertice(self, vertice):
         self.__assert_vertice_exists(vertice)
-        if self.distances_to_root[vertice] % 2 == 0:
-            assert vertice in self.unmarked_even_vertices, 'If vertice has an even distance to root, it must exist in unmarked even vertices set'
-            self.unmarked_even_vertices.remove(vertice)
+        i = self.indices[vertice]
+        if self.distances[i] % 2 == 0:
+            assert not self.marked[i], 'Even vertice must not already be marked'
+            self.marked[i] = True
         self.__assert_representation()
 
     def does_contain_vertice(self, vertice):
         self.__assert_representation()
-        return vertice in self.roots
+        return vertice in self.indices
 
     def add_edge(self, edge):
         v, w = edge
-        if v not in self.roots:
+        if v not in self.indices:
             self.__assert_vertice_does_not_exist(v)
             self.__assert_vertice_exists(w)
-            self.roots[v] = self.roots[w]
-            self.distances_to_root[v] = 1 + self.distances_to_root[w]
-            if self.distances_to_root[v] % 2 == 0:
-                self.unmarked_even_vertices.add(v)
-            self.parents[v] = w
-        elif w not in self.roots:
+            self.__add_vertice(v, self.indices[w])
+        elif w not in self.indices:
             self.__assert_vertice_does_not_exist(w)
             self.__assert_vertice_exists(v)
-            self.roots[w] = self.roots[v]
-            self.distances_to_root[w] = 1 + self.distances_to_root[v]
-            if self.distances_to_root[w] % 2 == 0:
-                self.unmarked_even_vertices.add(w)
-            self.parents[w] = v
+            self.__add_vertice(w, self.indices[v])
         else:
             assert False, 'At least one incident vertice must not already exist'
         self.__assert_representation()
@@ -520,12 +1632,12 @@ class Forest:
     def get_distance_to_root(self, vertice):
         self.__assert_representation()
         self.__assert_vertice_exists(vertice)
-        return self.distances_to_root[vertice]
+        return self.distances[self.indices[vertice]]
 
     def get_root(self, vertice):
         self.__assert_representation()
         self.__assert_vertice_exists(vertice)
-        return self.roots[vertice]
+        return self.labels[self.roots[self.indices[vertice]]]
 
     def get_path_from_root_to(self, vertice):
         self.__assert_representation()
@@ -534,54 +1646,86 @@ class Forest:
     def get_path_to_root_from(self, vertice):
         self.__assert_representation()
         self.__assert_vertice_exists(vertice)
-        root = self.roots[vertice]
-        path = []
-        parent = vertice
-        while parent != root:
-            path.append(parent)
-            parent = self.parents[parent]
-        path.append(root)
-        assert len(set(path)) == len(path), 'Path to root must not contain any duplicate vertices'
+        i = self.indices[vertice]
+        path = [vertice]
+        while self.parents[i] != i:
+            i = self.parents[i]
+            path.append(self.labels[i])
+        if _validation.level >= VALIDATION_LOCAL:
+            assert len(set(path)) == len(path), 'Path to root must not contain any duplicate vertices'
         return path
 
-    def get_blossom(self, v, w):
+    # Stepping up from both ends in turn, the first slot reached twice is the common ancestor, and neither side has
+    # climbed more than one step past it, so the cost is proportional to the blossom rather than to the tree depth.
+    def get_blossom(self, v, w, blossom_id):
         self.__assert_representation()
-        v_path = self.get_path_to_root_from(v)
-        w_path = self.get_path_to_root_from(w)
-        w_ancestors = set(w_path)
-        v_blossom_vertices = []
-        common_ancestor = None
-        for u in v_path:
-            if u in w_ancestors:
-                common_ancestor = u
+        self.__assert_vertice_exists(v)
+        self.__assert_vertice_exists(w)
+        assert self.roots[self.indices[v]] == self.roots[self.indices[w]], 'Vertices must share a root'
+        self.stamp += 2
+        marks = (self.stamp, self.stamp + 1)
+        stamps, parents = self.stamps, self.parents
+        sides = ([self.indices[v]], [self.indices[w]])
+        at_root = [False, False]
+        side = 0
+        while True:
+            path = sides[side]
+            i = path[-1]
+            if stamps[i] == marks[1 - side]:
                 break
+            stamps[i] = marks[side]
+            if parents[i] != i:
+                path.append(parents[i])
             else:
-                v_blossom_vertices.append(u)
-        assert common_ancestor is not None, 'Common ancestor must exist'
-        w_blossom_vertices = []
-        for u in w_path:
-            if u == common_ancestor:
-                break
-            else:
-                w_blossom_vertices.append(u)
-        blossom_vertices = [common_ancestor] + list(reversed(v_blossom_vertices)) + w_blossom_vertices
-        assert len(set(blossom_vertices)) == len(blossom_vertices), 'Blossom must not contain any duplicate vertices'
+                assert not at_root[1 - side], 'Common ancestor must exist'
+                at_root[side] = True
+            if not at_root[1 - side]:
+                side = 1 - side
+        common_ancestor = sides[side].pop()
+        other = sides[1 - side]
+        del other[other.index(common_ancestor):]
+        labels = self.labels
+        blossom_vertices = [labels[common_ancestor]]
+        blossom_vertices.extend(labels[i] for i in reversed(sides[0]))
+        blossom_vertices.extend(labels[i] for i in sides[1])
+        if _validation.level >= VALIDATION_LOCAL:
+            assert len(set(blossom_vertices)) == len(blossom_vertices), 'Blossom must not contain any duplicate vertices'
         assert len(blossom_vertices) % 2 != 0, 'Blossom must contain an odd number of vertices'
-        blossom = Blossom(blossom_vertices, common_ancestor)
+        blossom = Blossom(blossom_vertices, labels[common_ancestor], blossom_id)
         return blossom
 
-class Blossom:
+class _BlossomId:
 
-    count = 0
+    # Contracted blossoms need vertice labels that cannot clash with real ones, whatever their type, so they get their
+    # own. They sort before every real label, which keeps sorted edge tuples working, and among themselves by number.
 
-    def __init__(self, vertices, base):
-        Blossom.count += 1
-        self.id = -Blossom.count
+    __slots__ = ('number',)
+
+    def __init__(self, number):
+        self.number = number
+
+    def __lt__(self, other):
+        return not isinstance(other, _BlossomId) or self.number < other.number
+
+    def __gt__(self, other):
+        return isinstance(other, _BlossomId) and self.number > other.number
+
+    def __repr__(self):
+        return 'Blossom(%d)' % self.number
+
+class Blossom:
+
+    def __init__(self, vertices, base, id):
+        self.id = id
         self.vertices = vertices
         self.base = base
+        self.positions = {v: i for i, v in enumerate(vertices)}
+        self.entries = {}
         self.__assert_representation()
 
     def __assert_representation(self):
+        if _validation.level < VALIDATION_FULL:
+            return
         assert self.vertices[0] == self.base, 'Blossom must begin with base vertice'
         assert len(self.vertices) % 2 != 0, 'Blossom must have an odd number of vertices'
         assert len(self.vertices) >= 3, 'Blossom must have at least three vertices'
@@ -605,6 +1749,880 @@ class Blossom:
 
     def traverse_left(self):
         self.__assert_representation()
-        for vertice in reversed(self.vertices[1:] + self.vertices[:1]):
-            yield vertice
+        yield self.vertices[0]
+        for i in range(len(self.vertices) - 1, 0, -1):
+            yield self.vertices[i]
+
+    def does_contain_vertice(self, vertice):
+        return vertice in self.positions
+
+    def set_entry(self, neighbor, vertice):
+        self.entries[neighbor] = vertice
+
+    def get_entry(self, neighbor):
+        return self.entries.get(neighbor)
+
+    # The cycle is odd, so exactly one way round from the base reaches a vertice over an even number of edges, and that
+    # is the way that leaves the base and arrives at the vertice through unmatched and matched edges respectively.
+    def get_path_to(self, vertice):
+        i = self.positions[vertice]
+        if i % 2 == 0:
+            return self.vertices[:i + 1]
+        path = [self.base]
+        path.extend(reversed(self.vertices[i:]))
+        return path
+
+class CompactGraph:
+
+    def __init__(self, edges=None, offsets=None, neighbors=None, labels=None):
+        if edges is None:
+            self.labels = list(range(len(offsets) - 1)) if labels is None else labels
+            self.indices = dict(zip(self.labels, range(len(self.labels))))
+            self.offsets = offsets
+            self.neighbors = neighbors
+            self.__assert_representation()
+            return
+        self.labels = []
+        self.indices = {}
+        adjacency = []
+        for v, w in edges:
+            if v == w:
+                continue
+            i = self.indices.get(v)
+            if i is None:
+                i = self.indices[v] = len(self.labels)
+                self.labels.append(v)
+                adjacency.append([])
+            j = self.indices.get(w)
+            if j is None:
+                j = self.indices[w] = len(self.labels)
+                self.labels.append(w)
+                adjacency.append([])
+            adjacency[i].append(j)
+            adjacency[j].append(i)
+        self.offsets = array.array('i', [0])
+        self.neighbors = array.array('i')
+        for neighbors in adjacency:
+            self.neighbors.extend(set(neighbors))
+            self.offsets.append(len(self.neighbors))
+        self.__assert_representation()
+
+    def __assert_representation(self):
+        if _validation.level < VALIDATION_FULL:
+            return
+        assert len(self.offsets) == len(self.labels) + 1, 'Offsets must have one entry per vertice plus one'
+        assert self.offsets[-1] == len(self.neighbors), 'Last offset must be the number of neighbors'
+        for v in range(len(self.labels)):
+            assert self.indices[self.labels[v]] == v, 'Label and index maps must be inverse'
+            assert self.offsets[v] < self.offsets[v + 1], 'Vertice must have at least one neighbor'
+            for w in self[v]:
+                assert w != v, 'Vertice must not neighbor itself'
+                assert v in self[w], 'Reciprocal edge must exist in neighbors'
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __getitem__(self, vertice):
+        return self.neighbors[self.offsets[vertice]:self.offsets[vertice + 1]]
+
+    def get_vertices(self):
+        return self.labels
+
+    def get_edge_count(self):
+        return len(self.neighbors) // 2
+
+    def get_index(self, vertice):
+        return self.indices[vertice]
+
+    def get_neighbors(self, vertice):
+        return [self.labels[w] for w in self[self.indices[vertice]]]
+
+    def get_graph(self):
+        graph = Graph()
+        labels = self.labels
+        offsets = self.offsets
+        neighbors = [labels[w] for w in self.neighbors]
+        for v in range(len(labels)):
+            graph.adjacency[labels[v]] = set(neighbors[offsets[v]:offsets[v + 1]])
+        return graph
+
+class CompactMatching:
+
+    def __init__(self, graph, mates=None):
+        self.graph = graph
+        self.mates = array.array('i', [-1]) * len(graph) if mates is None else mates
+        self.__assert_representation()
+
+    def __assert_representation(self):
+        if _validation.level < VALIDATION_FULL:
+            return
+        assert len(self.mates) == len(self.graph), 'Mates must have one entry per vertice'
+        for v, w in enumerate(self.mates):
+            if w != -1:
+                self.__assert_edge_exists((v, w))
+
+    def __assert_edge_exists(self, edge):
+        if _validation.level < VALIDATION_LOCAL:
+            return
+        v, w = edge
+        assert self.mates[v] == w, 'Edge must exist in mates'
+        assert self.mates[w] == v, 'Reciprocal edge must exist in mates'
+        assert w in self.graph[v], 'Edge must exist in graph'
+
+    def __assert_vertice_is_exposed(self, vertice):
+        if _validation.level < VALIDATION_LOCAL:
+            return
+        assert self.mates[vertice] == -1, 'Vertice must have no mate'
+
+    def copy(self):
+        self.__assert_representation()
+        matching = CompactMatching.__new__(CompactMatching)
+        matching.graph = self.graph
+        matching.mates = array.array('i', self.mates)
+        matching.__assert_representation()
+        return matching
+
+    def augment(self, path):
+        matching = self.copy()
+        matching.augment_in_place(path)
+        return matching
+
+    def augment_in_place(self, path):
+        path = [self.graph.indices[v] for v in path]
+        self.__assert_vertice_is_exposed(path[0])
+        self.__assert_vertice_is_exposed(path[-1])
+        _augment_mates(self.mates, path)
+        for i in range(0, len(path), 2):
+            self.__assert_edge_exists((path[i], path[i+1]))
+        self.__assert_representation()
+
+    def get_size(self):
+        return sum(1 for w in self.mates if w != -1) // 2
+
+    def get_edges(self):
+        self.__assert_representation()
+        labels = self.graph.labels
+        return set(tuple(sorted((labels[v], labels[w]))) for v, w in enumerate(self.mates) if v < w)
+
+    def get_exposed_vertices(self):
+        self.__assert_representation()
+        return [self.graph.labels[v] for v, w in enumerate(self.mates) if w == -1]
+
+    def get_matched_vertice(self, vertice):
+        self.__assert_representation()
+        w = self.mates[self.graph.indices[vertice]]
+        assert w != -1, 'Vertice must not be exposed'
+        return self.graph.labels[w]
+
+    def get_matching(self):
+        matching = Matching()
+        matching.add_vertices(self.graph.labels)
+        for edge in self.get_edges():
+            matching.augment_in_place(edge)
+        return matching
+
+class Solution:
+
+    def __init__(self, matching, warm_start_size, engine, status=STATUS_MAXIMUM, certificate=None, guarantee=1.0, reduction_ratio=None):
+        self.matching = matching
+        self.warm_start_size = warm_start_size
+        self.engine = engine
+        self.status = status
+        self.certificate = certificate
+        self.guarantee = guarantee
+        self.reduction_ratio = reduction_ratio
+
+    def get_matching(self):
+        return self.matching
+
+    def get_size(self):
+        return len(self.matching.get_edges())
+
+    def get_warm_start_size(self):
+        return self.warm_start_size
+
+    def get_engine(self):
+        return self.engine
+
+    def get_status(self):
+        return self.status
+
+    def get_certificate(self):
+        return self.certificate
+
+    def get_guarantee(self):
+        return self.guarantee
+
+    def get_reduction_ratio(self):
+        return self.reduction_ratio
+
+class MatchingScores:
+
+    # One entry per scored matching. A matching is valid when every edge is in the graph and no vertice is repeated.
+
+    def __init__(self, sizes, missing_edge_counts, conflict_counts, exposed_counts):
+        self.sizes = sizes
+        self.missing_edge_counts = missing_edge_counts
+        self.conflict_counts = conflict_counts
+        self.exposed_counts = exposed_counts
+
+    def __len__(self):
+        return len(self.sizes)
+
+    def get_sizes(self):
+        return self.sizes
+
+    def get_missing_edge_counts(self):
+        return self.missing_edge_counts
+
+    def get_conflict_counts(self):
+        return self.conflict_counts
+
+    def get_exposed_counts(self):
+        return self.exposed_counts
+
+    def get_valid(self):
+        return (self.missing_edge_counts == 0) & (self.conflict_counts == 0)
+
+class Certificate:
+
+    # The Gallai-Edmonds decomposition of a graph by a maximum matching. Even vertices are those some maximum matching
+    # leaves exposed, odd vertices are their other neighbors, and every remaining vertice is matched in every maximum
+    # matching. The odd vertices are the barrier the Tutte-Berge formula needs.
+
+    def __init__(self, even_vertices, odd_vertices, unreached_vertices):
+        self.even_vertices = even_vertices
+        self.odd_vertices = odd_vertices
+        self.unreached_vertices = unreached_vertices
+
+    def get_even_vertices(self):
+        return self.even_vertices
+
+    def get_odd_vertices(self):
+        return self.odd_vertices
+
+    def get_unreached_vertices(self):
+        return self.unreached_vertices
+
+class _Progress:
+
+    # Every augmentation grows the matching by one edge, so stopping after any of them leaves a valid matching. The
+    # deadline is a time.monotonic() value, and it is only checked between augmentations, so a single search can run
+    # past it. The status stays maximum unless a limit stops the solve before a search comes back empty. Checkpoints
+    # are handed the matching being solved every checkpoint_interval augmentations, and should copy what they keep.
+
+    def __init__(self, size, target_size, deadline, max_augmentations, checkpoint=None, checkpoint_interval=1000):
+        self.size = size
+        self.target_size = target_size
+        self.deadline = deadline
+        self.max_augmentations = max_augmentations
+        self.checkpoint = checkpoint
+        self.checkpoint_interval = checkpoint_interval
+        self.augmentation_count = 0
+        self.status = STATUS_MAXIMUM
+
+    def is_spent(self):
+        if self.target_size is not None and self.size >= self.target_size:
+            self.status = STATUS_TARGET
+        elif self.max_augmentations is not None and self.augmentation_count >= self.max_augmentations:
+            self.status = STATUS_BUDGET
+        elif self.deadline is not None and time.monotonic() >= self.deadline:
+            self.status = STATUS_BUDGET
+        return self.status != STATUS_MAXIMUM
+
+    def on_augment(self, matching):
+        self.size += 1
+        self.augmentation_count += 1
+        if self.checkpoint is not None and self.augmentation_count % self.checkpoint_interval == 0:
+            self.checkpoint(matching)
+        return self.is_spent()
+
+    def limit(self, augmenting_paths, matching):
+        if self.is_spent():
+            return
+        for augmenting_path in augmenting_paths:
+            yield augmenting_path
+            if self.on_augment(matching):
+                return
+
+# https://doi.org/10.1109/SFCS.1981.21
+class Kernel:
+
+    # Some maximum matching matches every degree-1 vertice to its neighbor, so both are matched and removed. A degree-2
+    # vertice v with neighbors u and w is folded by merging w into u and removing v, which lowers the maximum by one
+    # whatever u and w neighbor. Unfolding matches v to whichever of u and w the matched edge of the merged vertice
+    # does not come from. Degree-1 vertices are always reduced first, and w is the one of the two with fewer neighbors
+    # so that each edge moves O(log V) times. What remains once no vertice has degree 1 or 2 is solved as usual.
+
+    def __init__(self, graph):
+        if isinstance(graph, CompactGraph):
+            labels, adjacency = graph.labels, [set(graph[v]) for v in range(len(graph))]
+        else:
+            labels = list(graph.get_vertices())
+            indices = {t: i for i, t in enumerate(labels)}
+            adjacency = [set(indices[u] for u in graph.adjacency[t]) for t in labels]
+        self.graph = graph
+        self.labels = labels
+        self.operations = []
+        n = len(adjacency)
+        degree_one_vertices = [v for v in range(n) if len(adjacency[v]) == 1]
+        degree_two_vertices = [v for v in range(n) if len(adjacency[v]) == 2]
+
+        def update(t):
+            if len(adjacency[t]) == 1:
+                degree_one_vertices.append(t)
+            elif len(adjacency[t]) == 2:
+                degree_two_vertices.append(t)
+
+        while len(degree_one_vertices) > 0 or len(degree_two_vertices) > 0:
+            if len(degree_one_vertices) > 0:
+                v = degree_one_vertices.pop()
+                if len(adjacency[v]) != 1:
+                    continue
+                u = adjacency[v].pop()
+                self.operations.append((v, u))
+                for t in adjacency[u]:
+                    if t != v:
+                        adjacency[t].discard(u)
+                        update(t)
+                adjacency[u] = set()
+                continue
+            v = degree_two_vertices.pop()
+            if len(adjacency[v]) != 2:
+                continue
+            u, w = adjacency[v]
+            if len(adjacency[u]) < len(adjacency[w]):
+                u, w = w, u
+            adjacency[u].discard(v)
+            adjacency[w].discard(v)
+            adjacency[v] = set()
+            moved = adjacency[w]
+            adjacency[w] = set()
+            for t in moved:
+                adjacency[t].discard(w)
+                if t != u:
+                    adjacency[t].add(u)
+                    adjacency[u].add(t)
+                    update(t)
+            adjacency[u].discard(u)
+            update(u)
+            self.operations.append((v, u, w, moved))
+        edges = [(labels[v], labels[w]) for v in range(n) for w in adjacency[v] if v < w]
+        self.vertice_count = n
+        self.residual_vertice_count = sum(1 for v in range(n) if len(adjacency[v]) > 0)
+        if isinstance(graph, CompactGraph):
+            self.residual_graph = CompactGraph(edges)
+        else:
+            self.residual_graph = Graph()
+            self.residual_graph.add_edges(edges)
+
+    def get_graph(self):
+        return self.residual_graph
+
+    def get_reduction_ratio(self):
+        return 1 - self.residual_vertice_count / self.vertice_count if self.vertice_count > 0 else 0.0
+
+    def get_matching(self, residual_matching):
+        labels = self.labels
+        indices = self.graph.indices if isinstance(self.graph, CompactGraph) else {t: i for i, t in enumerate(labels)}
+        mates = [-1] * len(labels)
+        for t, u in residual_matching.get_edges():
+            mates[indices[t]] = indices[u]
+            mates[indices[u]] = indices[t]
+        for operation in reversed(self.operations):
+            if len(operation) == 2:
+                v, u = operation
+                mates[v] = u
+                mates[u] = v
+                continue
+            v, u, w, moved = operation
+            x = mates[u]
+            if x != -1 and x in moved:
+                mates[x] = w
+                mates[w] = x
+                mates[u] = v
+                mates[v] = u
+            else:
+                mates[v] = w
+                mates[w] = v
+        return _get_matching(self.graph, labels, mates)
+
+# https://en.wikipedia.org/wiki/Weisfeiler_Leman_graph_isomorphism_test
+# https://en.wikipedia.org/wiki/Partition_refinement
+def _get_canonical_order(adjacency):
+
+    # Vertices sit in one list cut into cells, first by degree, and a queue of cells is used to split the others by how
+    # many neighbors each vertex has in them until no count splits a cell. As in Hopcroft's minimization, only the
+    # vertices next to a splitter are touched, and the largest part of a split cell is left out of the queue when the
+    # cell itself is not waiting in it. While a cell still holds several vertices, the first of them is given a cell of
+    # its own and splitting resumes. Every step but that choice is label-invariant, so isomorphic components usually
+    # end in the same order and occasionally do not, which costs a cache miss but never a wrong answer.
+
+    n = len(adjacency)
+    elements = sorted(range(n), key=lambda v: len(adjacency[v]))
+    positions = [0] * n
+    cells = [0] * n
+    ends = [0] * n
+    queued = [False] * n
+    queue = collections.deque()
+    parts = []
+    for i, v in enumerate(elements):
+        positions[v] = i
+        if i > 0 and len(adjacency[v]) == len(adjacency[elements[i - 1]]):
+            cells[v] = cells[elements[i - 1]]
+        else:
+            cells[v] = i
+            parts.append(i)
+        ends[cells[v]] = i + 1
+    largest = max(parts, key=lambda start: ends[start] - start, default=0)
+    for start in parts:
+        if start != largest:
+            queue.append(start)
+            queued[start] = True
+    start = 0
+    while True:
+        while len(queue) > 0:
+            splitter = queue.popleft()
+            queued[splitter] = False
+            counts = {}
+            for i in range(splitter, ends[splitter]):
+                for w in adjacency[elements[i]]:
+                    counts[w] = counts.get(w, 0) + 1
+            touched = {}
+            for w in counts:
+                if ends[cells[w]] - cells[w] > 1:
+                    touched.setdefault(cells[w], []).append(w)
+            for cell in sorted(touched):
+                _split_cell(elements, positions, cells, ends, queued, queue, cell, touched[cell], counts)
+        while start < n and ends[start] - start == 1:
+            start = ends[start]
+        if start == n:
+            return elements
+        end = ends[start]
+        v, w = elements[start], elements[end - 1]
+        elements[start], elements[end - 1] = w, v
+        positions[w], positions[v] = start, end - 1
+        ends[start] = end - 1
+        cells[v] = end - 1
+        ends[end - 1] = end
+        queue.append(end - 1)
+        queued[end - 1] = True
+
+def _split_cell(elements, positions, cells, ends, queued, queue, start, members, counts):
+
+    # Moves the touched vertices to the back of the cell in order of count, leaving the untouched ones at the front
+    # under the old start.
+
+    end = ends[start]
+    tail = end - len(members)
+    for i, w in enumerate(members):
+        p, x = end - 1 - i, elements[end - 1 - i]
+        elements[positions[w]], elements[p] = x, w
+        positions[x], positions[w] = positions[w], p
+    members.sort(key=counts.__getitem__)
+    parts = [start] if tail > start else []
+    for i, w in enumerate(members):
+        elements[tail + i] = w
+        positions[w] = tail + i
+        if i == 0 or counts[w] != counts[members[i - 1]]:
+            parts.append(tail + i)
+    if len(parts) == 1:
+        return
+    for i, part in enumerate(parts):
+        ends[part] = parts[i + 1] if i + 1 < len(parts) else end
+    for part in parts[1:]:
+        for p in range(part, ends[part]):
+            cells[elements[p]] = part
+    if queued[start]:
+        largest = None
+    else:
+        largest = max(parts, key=lambda part: ends[part] - part)
+    for part in parts:
+        if part != largest and not queued[part]:
+            queue.append(part)
+            queued[part] = True
+
+class MatchingCache:
+
+    # Each connected component is put in canonical order and looked up by a hash of its edges in that order. The
+    # stored edges are compared exactly before a hit is trusted, and the stored matched pairs are mapped back through
+    # the order onto the component at hand. Entries are evicted least recently used first once there are more than
+    # max_entries of them or they hold more than max_bytes. With a directory given, every entry is also written there
+    # and entries missing from memory are read back from it, so a cache survives restarts. The directory is not
+    # evicted from.
+
+    def __init__(self, max_entries=1024, max_bytes=None, path=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.path = path
+        self.entries = collections.OrderedDict()
+        self.byte_count = 0
+        self.hit_count = 0
+        self.miss_count = 0
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get_hit_count(self):
+        return self.hit_count
+
+    def get_miss_count(self):
+        return self.miss_count
+
+    def get_byte_count(self):
+        return self.byte_count
+
+    def get_maximum_matching(self, graph, engine=None):
+        labels, adjacency, _ = _index_any(graph, _get_exposed_matching(graph))
+        n = len(adjacency)
+        exposed = [-1] * n
+        mates = [-1] * n
+        for component in _get_components(adjacency):
+            offsets, neighbors, _ = _get_component_task(adjacency, exposed, component)
+            component_mates = self.__get_mates(CompactGraph(offsets=offsets, neighbors=neighbors), engine)
+            for v, w in enumerate(component_mates):
+                if w != -1:
+                    mates[component[v]] = component[w]
+        return _get_matching(graph, labels, mates)
+
+    def __get_mates(self, graph, engine):
+        order = _get_canonical_order(graph)
+        positions = [0] * len(order)
+        for position, v in enumerate(order):
+            positions[v] = position
+        edges = array.array('i', [len(order)])
+        for position, v in enumerate(order):
+            edges.extend(sorted(positions[w] for w in graph[v] if positions[w] > position))
+            edges.append(-1)
+        key = hashlib.sha256(edges.tobytes()).hexdigest()
+        entry = self.__get(key)
+        mates = [-1] * len(order)
+        if entry is not None and entry[0] == edges:
+            self.hit_count += 1
+            for i in range(0, len(entry[1]), 2):
+                v, w = order[entry[1][i]], order[entry[1][i + 1]]
+                mates[v] = w
+                mates[w] = v
+            return mates
+        self.miss_count += 1
+        solved = solve(graph, engine=engine).get_matching().mates
+        matched = array.array('i')
+        for v, w in enumerate(solved):
+            mates[v] = w
+            if v < w:
+                matched.extend((positions[v], positions[w]))
+        self.__put(key, (edges, matched))
+        return mates
+
+    def __get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            return entry
+        if self.path is None or not os.path.exists(self.__get_path(key)):
+            return None
+        with open(self.__get_path(key), 'rb') as file:
+            buffer = file.read()
+        edge_count, = array.array('q', buffer[:8])
+        entry = (array.array('i', buffer[8:8 + 4 * edge_count]), array.array('i', buffer[8 + 4 * edge_count:]))
+        self.__put(key, entry, False)
+        return entry
+
+    def __put(self, key, entry, persist=True):
+        if key in self.entries:
+            self.byte_count -= self.__get_byte_count(self.entries.pop(key))
+        self.entries[key] = entry
+        self.byte_count += self.__get_byte_count(entry)
+        if persist and self.path is not None:
+            _write_snapshot(self.__get_path(key), (array.array('q', [len(entry[0])]), entry[0], entry[1]))
+        while len(self.entries) > self.max_entries or (self.max_bytes is not None and self.byte_count > self.max_bytes):
+            _, evicted = self.entries.popitem(last=False)
+            self.byte_count -= self.__get_byte_count(evicted)
+
+    def __get_path(self, key):
+        return os.path.join(self.path, key + '.bin')
+
+    def __get_byte_count(self, entry):
+        return entry[0].itemsize * (len(entry[0]) + len(entry[1]))
+
+class _Scratch:
+
+    # Per-vertex lists for the base-label search, kept clean between searches. Stamps only ever grow, so old ones never
+    # match a new search and are left as they are.
+
+    __slots__ = ('labels', 'parents', 'trees', 'links', 'stamps', 'stamp', 'depths', 'distances', 'zeros', 'blanks', 'identity')
+
+    def __init__(self, n):
+        self.zeros = [0] * n
+        self.blanks = [-1] * n
+        self.identity = list(range(n))
+        self.labels = self.zeros[:]
+        self.parents = self.blanks[:]
+        self.trees = self.blanks[:]
+        self.links = self.identity[:]
+        self.stamps = self.zeros[:]
+        self.stamp = 0
+        self.depths = self.zeros[:]
+        self.distances = self.zeros[:]
+        self.__assert_representation()
+
+    def __assert_representation(self):
+        if _validation.level < VALIDATION_FULL:
+            return
+        for v in range(len(self.labels)):
+            assert self.labels[v] == 0 and self.parents[v] == -1 and self.trees[v] == -1, 'Scratch must not hold any forest'
+            assert self.links[v] == v, 'Scratch must not hold any blossom'
+            assert self.depths[v] == self.distances[v] == 0, 'Scratch must not hold any depths or distances'
+
+    def __len__(self):
+        return len(self.labels)
+
+    # A small forest is put back vertex by vertex, while one reaching a good part of the graph is cheaper to put back by
+    # copying over whole lists.
+    def reset(self, vertices, labels=True):
+        for v in vertices:
+            if labels:
+                self.labels[v] = 0
+            self.parents[v] = -1
+            self.trees[v] = -1
+            self.links[v] = v
+            self.depths[v] = 0
+            self.distances[v] = 0
+        if labels:
+            self.__assert_representation()
+
+    def clear(self, labels=True):
+        if labels:
+            self.labels[:] = self.zeros
+        self.parents[:] = self.blanks
+        self.trees[:] = self.blanks
+        self.links[:] = self.identity
+        self.depths[:] = self.zeros
+        self.distances[:] = self.zeros
+        if labels:
+            self.__assert_representation()
+
+class Solver:
+
+    # A session owns the blossom id allocator and the scratch lists the searches reuse from call to call, so nothing is
+    # shared between sessions and each can run on its own thread. A single session is not meant to be shared between
+    # threads. Graphs are only read while solving, so any number of sessions can share one. A search takes the scratch
+    # while it runs, so a second search started before the first ends gets lists of its own, and the larger of the two
+    # is kept.
+
+    def __init__(self, engine=None, validation=None):
+        self.engine = engine
+        self.validation = validation
+        self.blossom_count = 0
+        self.scratch = None
+
+    def get_blossom_id(self):
+        self.blossom_count += 1
+        return _BlossomId(self.blossom_count)
+
+    def get_scratch(self, n):
+        scratch, self.scratch = self.scratch, None
+        if scratch is None or len(scratch) < n:
+            scratch = _Scratch(n)
+        return scratch
+
+    def put_scratch(self, scratch):
+        if self.scratch is None or len(self.scratch) < len(scratch):
+            self.scratch = scratch
+
+    def get_maximum_matching(self, graph, matching, stats=None, target_size=None, deadline=None, max_augmentations=None, checkpoint=None, checkpoint_interval=1000, epsilon=None):
+        self.blossom_count = 0
+        return get_maximum_matching(graph, matching, self.validation, self.engine, stats, self, target_size, deadline, max_augmentations, checkpoint, checkpoint_interval, epsilon)
+
+    def get_augmenting_path(self, graph, matching, stats=None):
+        self.blossom_count = 0
+        return get_augmenting_path(graph, matching, self.engine, stats, self)
+
+    def solve(self, graph, matching=None, warm_start=True, seed=None, bipartite=True, stats=None, target_size=None, deadline=None, max_augmentations=None, certify=False, checkpoint=None, checkpoint_interval=1000, epsilon=None, kernelize=False):
+        self.blossom_count = 0
+        return solve(graph, matching, self.validation, self.engine, warm_start, seed, bipartite, stats, self, target_size, deadline, max_augmentations, certify, checkpoint, checkpoint_interval, epsilon, kernelize)
+
+class Stats:
+
+    # Subclasses can override the on_ hooks to watch a solve as it runs, calling up to keep the counters. Seconds are
+    # split into forest search, blossom contraction, path lifting and augmentation. Only the contract engine contracts
+    # and lifts explicitly, so the other engines charge everything but augmentation to search.
+
+    def __init__(self):
+        self.augmentation_count = 0
+        self.contraction_count = 0
+        self.max_depth = 0
+        self.depth = 0
+        self.search_count = 0
+        self.forest_size = 0
+        self.max_forest_size = 0
+        self.edge_scan_count = 0
+        self.seconds = {'search': 0.0, 'contract': 0.0, 'lift': 0.0, 'augment': 0.0}
+
+    def on_augment(self, path):
+        self.augmentation_count += 1
+
+    def on_blossom(self, size, depth):
+        self.contraction_count += 1
+        self.max_depth = max(self.max_depth, depth)
+
+    def on_search(self, forest_size, edge_scan_count):
+        self.search_count += 1
+        self.forest_size += forest_size
+        self.max_forest_size = max(self.max_forest_size, forest_size)
+        self.edge_scan_count += edge_scan_count
+
+class DynamicSolver:
+
+    def __init__(self):
+        self.labels = []
+        self.indices = {}
+        self.adjacency = []
+        self.mates = []
+        self.free = []
+        self.size = 0
+        self.solver = Solver()
+        self.__assert_representation()
+
+    def __assert_representation(self):
+        if _validation.level < VALIDATION_FULL:
+            return
+        assert len(self.labels) == len(self.adjacency) == len(self.mates), 'Per-vertice lists must have same length'
+        assert len(self.indices) + len(self.free) == len(self.labels), 'Every index must be used or free'
+        size = 0
+        for t, u in self.indices.items():
+            assert self.labels[u] == t, 'Label and index maps must be inverse'
+            for w in self.adjacency[u]:
+                assert u in self.adjacency[w], 'Reciprocal edge must exist in adjacency'
+            if self.mates[u] != -1:
+                assert self.mates[self.mates[u]] == u, 'Reciprocal mate must exist'
+                assert self.mates[u] in self.adjacency[u], 'Matched edge must exist in adjacency'
+                size += 1
+        assert size == 2 * self.size, 'Size must count matched edges'
+        for u in self.free:
+            assert len(self.adjacency[u]) == 0 and self.mates[u] == -1, 'Free index must be cleared'
+
+    def __assert_vertice_exists(self, vertice):
+        if _validation.level < VALIDATION_LOCAL:
+            return
+        assert vertice in self.indices, 'Vertice must exist'
+
+    def __assert_edge_exists(self, edge):
+        if _validation.level < VALIDATION_LOCAL:
+            return
+        v, w = edge
+        assert v in self.indices and w in self.indices, 'Incident vertices must exist'
+        assert self.indices[w] in self.adjacency[self.indices[v]], 'Edge must exist in adjacency'
+
+    def __assert_edge_does_not_exist(self, edge):
+        if _validation.level < VALIDATION_LOCAL:
+            return
+        v, w = edge
+        assert v != w, 'Edge must not be a self-loop'
+        if v in self.indices and w in self.indices:
+            assert self.indices[w] not in self.adjacency[self.indices[v]], 'Edge must not exist in adjacency'
+
+    def add_vertice(self, vertice):
+        if vertice in self.indices:
+            return self.indices[vertice]
+        if len(self.free) > 0:
+            index = self.free.pop()
+            self.labels[index] = vertice
+        else:
+            index = len(self.labels)
+            self.labels.append(vertice)
+            self.adjacency.append(set())
+            self.mates.append(-1)
+        self.indices[vertice] = index
+        self.__assert_representation()
+        return index
+
+    def remove_vertice(self, vertice):
+        self.__assert_vertice_exists(vertice)
+        v = self.indices.pop(vertice)
+        for w in self.adjacency[v]:
+            self.adjacency[w].discard(v)
+        self.adjacency[v].clear()
+        self.labels[v] = None
+        self.free.append(v)
+        w = self.mates[v]
+        if w != -1:
+            self.__unmatch(v, w)
+            self.__augment_from([w])
+        self.__assert_representation()
+
+    def add_edge(self, edge):
+        self.__assert_edge_does_not_exist(edge)
+        v, w = self.add_vertice(edge[0]), self.add_vertice(edge[1])
+        self.adjacency[v].add(w)
+        self.adjacency[w].add(v)
+        if self.mates[v] == -1 and self.mates[w] == -1:
+            _augment_mates(self.mates, [v, w])
+            self.size += 1
+        elif self.mates[v] == -1:
+            self.__augment_from([v])
+        elif self.mates[w] == -1:
+            self.__augment_from([w])
+        else:
+            self.__augment_from(None)
+        self.__assert_representation()
+
+    def add_edges(self, edges):
+        for edge in edges:
+            self.__assert_edge_does_not_exist(edge)
+            v, w = self.add_vertice(edge[0]), self.add_vertice(edge[1])
+            self.adjacency[v].add(w)
+            self.adjacency[w].add(v)
+        for _ in _augment_by_bases(self.adjacency, self.mates, True, solver=self.solver):
+            self.size += 1
+        self.__assert_representation()
+
+    def remove_edge(self, edge):
+        self.__assert_edge_exists(edge)
+        v, w = self.indices[edge[0]], self.indices[edge[1]]
+        self.adjacency[v].remove(w)
+        self.adjacency[w].remove(v)
+        if self.mates[v] == w:
+            self.__unmatch(v, w)
+            if not self.__augment_from([v]):
+                self.__augment_from([w])
+        self.__assert_representation()
+
+    def __unmatch(self, v, w):
+        self.mates[v] = -1
+        self.mates[w] = -1
+        self.size -= 1
+
+    def __augment_from(self, roots):
+        if roots is None:
+            roots = [v for v in self.indices.values() if self.mates[v] == -1 and len(self.adjacency[v]) > 0]
+        for augmenting_path in _get_augmenting_paths_by_bases(self.adjacency, self.mates, roots=roots, solver=self.solver):
+            _augment_mates(self.mates, augmenting_path)
+            self.size += 1
+            return True
+        return False
+
+    def get_size(self):
+        return self.size
+
+    def get_vertices(self):
+        return self.indices.keys()
+
+    def get_matched_vertice(self, vertice):
+        self.__assert_vertice_exists(vertice)
+        w = self.mates[self.indices[vertice]]
+        assert w != -1, 'Vertice must not be exposed'
+        return self.labels[w]
+
+    def get_graph(self):
+        graph = Graph()
+        for v in self.indices.values():
+            for w in self.adjacency[v]:
+                if v < w:
+                    graph.add_edge((self.labels[v], self.labels[w]))
+        return graph
 
+    def get_matching(self):
+        return _get_matching(None, self.labels, self.mates, self.indices.keys())
@@ -1,6 +1,33 @@
+import array
+import asyncio
+import concurrent.futures
+import os
+import random
+import tempfile
+import time
 import unittest
 import blossom
 
+def get_random_graph(vertice_count, edge_probability, seed):
+    rng = random.Random(seed)
+    graph = blossom.Graph()
+    for v in range(vertice_count):
+        for w in range(v + 1, vertice_count):
+            if rng.random() < edge_probability:
+                graph.add_edge((v, w))
+    return graph
+
+def get_exposed_matching(graph):
+    matching = blossom.Matching()
+    matching.add_vertices(graph.get_vertices())
+    return matching
+
+def assert_is_matching(test, graph, matching):
+    matched = [v for edge in matching.edges for v in edge]
+    test.assertEqual(len(matched), len(set(matched)))
+    for v, w in matching.edges:
+        test.assertTrue(w in graph.adjacency[v])
+
 class TestBlossom(unittest.TestCase):
 
     def test1(self):
@@ -167,6 +194,941 @@ class TestBlossom(unittest.TestCase):
         actual = tuple(sorted(blossom.get_maximum_matching(graph, matching).edges))
         self.assertTrue(actual in expected)
 
+    def test5(self):
+
+        # INPUT:
+        #       ,---.
+        #    ,-1--2--3
+        #   0  |  |  |
+        #    `-5--4-'
+
+        # EXPECTED:
+        #   Same size at every validation level
+
+        for validation in (blossom.VALIDATION_OFF, blossom.VALIDATION_LOCAL, blossom.VALIDATION_FULL):
+            graph = blossom.Graph()
+            for edge in ((0, 1), (0, 5), (1, 2), (1, 3), (1, 5), (2, 3), (2, 4), (3, 4), (4, 5)):
+                graph.add_edge(edge)
+            matching = blossom.Matching()
+            matching.add_vertices(graph.get_vertices())
+            actual = blossom.get_maximum_matching(graph, matching, validation=validation)
+            self.assertEqual(len(actual.edges), 3)
+            self.assertEqual(blossom.get_validation(), blossom.VALIDATION_FULL)
+
+    def test6(self):
+
+        # INPUT:
+        #   0--1, then 0--1 again
+
+        # EXPECTED:
+        #   Duplicate edge is only caught when validation is enabled, and a level set for the process reaches a pool
+        #   thread that already ran, while a level set by validating stays in its own thread
+
+        graph = blossom.Graph()
+        graph.add_edge((0, 1))
+        with blossom.validating(blossom.VALIDATION_LOCAL):
+            self.assertRaises(AssertionError, graph.add_edge, (0, 1))
+        with blossom.validating(blossom.VALIDATION_OFF):
+            graph.add_edge((0, 1))
+        self.assertEqual(blossom.get_validation(), blossom.VALIDATION_FULL)
+        with concurrent.futures.ThreadPoolExecutor(1) as executor:
+            self.assertEqual(executor.submit(blossom.get_validation).result(), blossom.VALIDATION_FULL)
+            blossom.set_validation(blossom.VALIDATION_OFF)
+            try:
+                self.assertEqual(executor.submit(blossom.get_validation).result(), blossom.VALIDATION_OFF)
+                with blossom.validating(blossom.VALIDATION_LOCAL):
+                    self.assertEqual(blossom.get_validation(), blossom.VALIDATION_LOCAL)
+                    self.assertEqual(executor.submit(blossom.get_validation).result(), blossom.VALIDATION_OFF)
+            finally:
+                blossom.set_validation(blossom.VALIDATION_FULL)
+        self.assertEqual(blossom.get_validation(), blossom.VALIDATION_FULL)
+
+    def test7(self):
+
+        # INPUT:
+        #   0--1--2-- ... --2100
+
+        # EXPECTED:
+        #   1050 matched edges, more augmentations than the recursion limit
+
+        with blossom.validating(blossom.VALIDATION_OFF):
+            graph = blossom.Graph()
+            for v in range(2100):
+                graph.add_edge((v, v + 1))
+            matching = blossom.Matching()
+            matching.add_vertices(graph.get_vertices())
+            actual = blossom.get_maximum_matching(graph, matching)
+        self.assertEqual(len(actual.edges), 1050)
+        self.assertEqual(len(matching.edges), 0)
+
+    def test8(self):
+
+        # INPUT:
+        #   0--1--2--3
+
+        # EXPECTED:
+        #   augment returns a snapshot, augment_in_place mutates
+
+        matching = blossom.Matching()
+        matching.add_vertices(range(4))
+        snapshot = matching.augment([1, 2])
+        self.assertEqual(snapshot.edges, {(1, 2)})
+        self.assertEqual(matching.edges, set())
+        matching.augment_in_place([1, 2])
+        matching.augment_in_place([0, 1, 2, 3])
+        self.assertEqual(matching.edges, {(0, 1), (2, 3)})
+        self.assertEqual(snapshot.edges, {(1, 2)})
+
+    def test9(self):
+
+        # INPUT:
+        #   Random graphs with 2 to 40 vertices
+
+        # EXPECTED:
+        #   Base-label engine matches the contraction engine
+
+        with blossom.validating(blossom.VALIDATION_LOCAL):
+            for seed in range(60):
+                graph = get_random_graph(2 + seed % 39, 0.05 + (seed % 7) / 10, seed)
+                if len(graph.get_vertices()) == 0:
+                    continue
+                expected = blossom.get_maximum_matching(graph, get_exposed_matching(graph))
+                actual = blossom.get_maximum_matching(graph, get_exposed_matching(graph), engine=blossom.ENGINE_BASES)
+                assert_is_matching(self, graph, actual)
+                self.assertEqual(len(actual.edges), len(expected.edges))
+
+    def test10(self):
+
+        # INPUT:
+        #          ,-3--4
+        #   0--1--2     |
+        #          `-6--5--7
+
+        # EXPECTED:
+        #   Augmenting path from 0 to 7 through the blossom on 2
+
+        graph = blossom.Graph()
+        for edge in ((0, 1), (1, 2), (2, 3), (3, 4), (4, 5), (5, 6), (2, 6), (5, 7)):
+            graph.add_edge(edge)
+        matching = get_exposed_matching(graph)
+        matching.augment_in_place([1, 2])
+        matching.augment_in_place([3, 4])
+        matching.augment_in_place([5, 6])
+        path = blossom.get_augmenting_path(graph, matching, engine=blossom.ENGINE_BASES)
+        self.assertEqual(sorted((path[0], path[-1])), [0, 7])
+        self.assertEqual(len(path) % 2, 0)
+        for i in range(len(path) - 1):
+            self.assertTrue(path[i + 1] in graph.adjacency[path[i]])
+        matching.augment_in_place(path)
+        self.assertEqual(len(matching.edges), 4)
+
+    def test11(self):
+
+        # INPUT:
+        #   A matching whose only augmenting path 4-5=3-1=7-0=2-8 runs through blossom 0-1=7 nested in blossom
+        #   4-2=0-1=7-3=5-4 when the search starts from 4
+
+        # EXPECTED:
+        #   Every engine grows the matching to five edges
+
+        edges = [(0, 1), (0, 2), (0, 7), (0, 9), (1, 2), (1, 3), (1, 5), (1, 7), (2, 4), (2, 5), (2, 8), (2, 9), (3, 5), (3, 7), (4, 5), (6, 9), (8, 9)]
+        for engine in (blossom.ENGINE_CONTRACT, blossom.ENGINE_BASES, blossom.ENGINE_FOREST):
+            graph = blossom.Graph()
+            for edge in edges:
+                graph.add_edge(edge)
+            matching = get_exposed_matching(graph)
+            for edge in ((0, 2), (1, 7), (3, 5), (6, 9)):
+                matching.augment_in_place(list(edge))
+            matching = blossom.get_maximum_matching(graph, matching, engine=engine)
+            assert_is_matching(self, graph, matching)
+            self.assertEqual(len(matching.edges), 5)
+
+    def test12(self):
+
+        # INPUT:
+        #   Graphs from test1 to test4, then random graphs with 2 to 51 vertices
+
+        # EXPECTED:
+        #   Forest engine matches the contraction engine
+
+        graphs = []
+        for edges in (
+            ((0, 1), (0, 5), (1, 2), (1, 3), (1, 4), (1, 5)),
+            ((0, 1), (0, 5), (1, 2), (1, 5), (2, 3), (2, 4), (4, 5)),
+            ((0, 1), (0, 4), (1, 2), (1, 4), (2, 3), (3, 4)),
+            ((0, 1), (0, 5), (1, 2), (1, 3), (1, 5), (2, 3), (2, 4), (3, 4), (4, 5)),
+        ):
+            graph = blossom.Graph()
+            for edge in edges:
+                graph.add_edge(edge)
+            graphs.append(graph)
+        with blossom.validating(blossom.VALIDATION_OFF):
+            for seed in range(50):
+                graphs.append(get_random_graph(2 + seed, 0.02 + (seed % 9) / 12, seed))
+            for graph in graphs:
+                if len(graph.get_vertices()) == 0:
+                    continue
+                expected = blossom.get_maximum_matching(graph, get_exposed_matching(graph))
+                actual = blossom.get_maximum_matching(graph, get_exposed_matching(graph), engine=blossom.ENGINE_FOREST)
+                assert_is_matching(self, graph, actual)
+                self.assertEqual(len(actual.edges), len(expected.edges))
+
+    def test13(self):
+
+        # INPUT:
+        #   Random graphs as Graph and as CompactGraph
+
+        # EXPECTED:
+        #   Compact solve has the same size, and its edges exist in the graph
+
+        with blossom.validating(blossom.VALIDATION_LOCAL):
+            for seed in range(30):
+                graph = get_random_graph(2 + 2 * seed, 0.05 + (seed % 5) / 8, seed)
+                if len(graph.get_vertices()) == 0:
+                    continue
+                edges = [(v, w) for v in graph.adjacency for w in graph.adjacency[v]]
+                compact_graph = blossom.CompactGraph(edges)
+                self.assertEqual(compact_graph.get_edge_count(), len(edges) // 2)
+                expected = blossom.get_maximum_matching(graph, get_exposed_matching(graph), engine=blossom.ENGINE_BASES)
+                for engine in (blossom.ENGINE_BASES, blossom.ENGINE_FOREST):
+                    compact_matching = blossom.CompactMatching(compact_graph)
+                    actual = blossom.get_maximum_matching(compact_graph, compact_matching, engine=engine)
+                    self.assertEqual(actual.get_size(), len(expected.edges))
+                    self.assertEqual(compact_matching.get_size(), 0)
+                    assert_is_matching(self, graph, actual.get_matching())
+
+    def test14(self):
+
+        # INPUT:
+        #   a--b--c--d, with a duplicate edge and a self-loop
+
+        # EXPECTED:
+        #   Duplicates and self-loops dropped, labels preserved
+
+        graph = blossom.CompactGraph([('a', 'b'), ('b', 'c'), ('c', 'b'), ('c', 'c'), ('c', 'd')])
+        self.assertEqual(graph.get_vertices(), ['a', 'b', 'c', 'd'])
+        self.assertEqual(graph.get_edge_count(), 3)
+        self.assertEqual(sorted(graph.get_neighbors('c')), ['b', 'd'])
+        matching = blossom.get_maximum_matching(graph, blossom.CompactMatching(graph))
+        self.assertEqual(matching.get_edges(), {('a', 'b'), ('c', 'd')})
+        self.assertEqual(matching.get_matched_vertice('d'), 'c')
+        self.assertEqual(matching.get_exposed_vertices(), [])
+        self.assertEqual(matching.get_matching().edges, {('a', 'b'), ('c', 'd')})
+
+    def test15(self):
+
+        # INPUT:
+        #   Random graphs with 2 to 41 vertices
+
+        # EXPECTED:
+        #   Warm start is maximal and the solve stays maximum
+
+        with blossom.validating(blossom.VALIDATION_LOCAL):
+            for seed in range(40):
+                graph = get_random_graph(2 + seed, 0.03 + (seed % 6) / 10, seed)
+                if len(graph.get_vertices()) == 0:
+                    continue
+                matching = blossom.get_maximal_matching(graph, seed=seed)
+                assert_is_matching(self, graph, matching)
+                for v in matching.get_exposed_vertices():
+                    for w in graph.adjacency[v]:
+                        self.assertFalse(w in matching.get_exposed_vertices())
+                expected = blossom.get_maximum_matching(graph, get_exposed_matching(graph), engine=blossom.ENGINE_BASES)
+                solution = blossom.solve(graph, seed=seed)
+                assert_is_matching(self, graph, solution.get_matching())
+                self.assertEqual(solution.get_size(), len(expected.edges))
+                self.assertEqual(solution.get_warm_start_size(), len(matching.edges))
+                self.assertTrue(solution.get_warm_start_size() <= solution.get_size())
+
+    def test16(self):
+
+        # INPUT:
+        #   0--1--2-- ... --100
+
+        # EXPECTED:
+        #   Degree-one rule alone matches the path perfectly
+
+        graph = blossom.CompactGraph([(v, v + 1) for v in range(100)])
+        solution = blossom.solve(graph, warm_start=True)
+        self.assertEqual(solution.get_warm_start_size(), 50)
+        self.assertEqual(solution.get_size(), 50)
+        self.assertEqual(blossom.solve(graph, warm_start=False).get_warm_start_size(), None)
+
+    def test17(self):
+
+        # INPUT:
+        #   Random sequences of edge and vertice insertions and removals
+
+        # EXPECTED:
+        #   Dynamic size always equals a from-scratch solve
+
+        rng = random.Random(16)
+        with blossom.validating(blossom.VALIDATION_LOCAL):
+            for _ in range(20):
+                solver = blossom.DynamicSolver()
+                edges = set(tuple(sorted(rng.sample(range(12), 2))) for _ in range(6))
+                solver.add_edges(edges)
+                for _ in range(40):
+                    action = rng.random()
+                    if action < 0.6 or len(edges) == 0:
+                        edge = tuple(sorted(rng.sample(range(12), 2)))
+                        if edge in edges:
+                            continue
+                        solver.add_edge(edge)
+                        edges.add(edge)
+                    elif action < 0.9:
+                        edge = rng.choice(sorted(edges))
+                        solver.remove_edge(edge)
+                        edges.remove(edge)
+                    else:
+                        vertice = rng.choice(sorted(solver.get_vertices()))
+                        solver.remove_vertice(vertice)
+                        edges = set(edge for edge in edges if vertice not in edge)
+                    graph = blossom.Graph()
+                    for edge in edges:
+                        graph.add_edge(edge)
+                    expected = blossom.get_maximum_matching(graph, get_exposed_matching(graph), engine=blossom.ENGINE_BASES)
+                    actual = solver.get_matching()
+                    self.assertEqual(solver.get_size(), len(expected.edges))
+                    self.assertEqual(len(actual.edges), len(expected.edges))
+                    assert_is_matching(self, graph, actual)
+
+    def test18(self):
+
+        # INPUT:
+        #   Twenty disjoint random graphs, with a partial starting matching, then five hundred disjoint paths
+
+        # EXPECTED:
+        #   Component solve matches a whole-graph solve, inline and in a process pool, with small components in chunks
+
+        graph = blossom.Graph()
+        for i in range(20):
+            component = get_random_graph(4 + i, 0.3, i)
+            for v in component.adjacency:
+                for w in component.adjacency[v]:
+                    if v < w:
+                        graph.add_edge(((i, v), (i, w)))
+        matching = get_exposed_matching(graph)
+        v = next(iter(graph.get_vertices()))
+        matching.augment_in_place([v, next(iter(graph.adjacency[v]))])
+        expected = blossom.get_maximum_matching(graph, matching, engine=blossom.ENGINE_BASES)
+        for chunk_edge_count in (1000, 10):
+            solution = blossom.solve_components(graph, matching, workers=2, chunk_edge_count=chunk_edge_count)
+            assert_is_matching(self, graph, solution.get_matching())
+            self.assertEqual(solution.get_size(), len(expected.edges))
+            self.assertEqual(set(solution.get_matching().adjacency), set(matching.adjacency))
+        compact_graph = blossom.CompactGraph([(v, w) for v in graph.adjacency for w in graph.adjacency[v]])
+        solution = blossom.solve_components(compact_graph, workers=2, chunk_edge_count=10, warm_start=False)
+        self.assertEqual(solution.get_size(), len(expected.edges))
+        self.assertEqual(solution.get_warm_start_size(), None)
+        paths = blossom.CompactGraph([((i, 0), (i, 1)) for i in range(500)] + [((i, 1), (i, 2)) for i in range(500)])
+        self.assertEqual(blossom.solve_components(paths, workers=2, chunk_edge_count=50).get_size(), 500)
+
+    def test19(self):
+
+        # INPUT:
+        #   Random bipartite graphs, then the graph from test1
+
+        # EXPECTED:
+        #   Bipartite graphs take the Hopcroft-Karp path with the same size
+
+        rng = random.Random(18)
+        with blossom.validating(blossom.VALIDATION_LOCAL):
+            for seed in range(30):
+                graph = blossom.Graph()
+                for v in range(1 + seed % 9):
+                    for w in range(1 + seed % 13):
+                        if rng.random() < 0.3:
+                            graph.add_edge((('left', v), ('right', w)))
+                if len(graph.get_vertices()) == 0:
+                    continue
+                self.assertTrue(blossom.is_bipartite(graph))
+                expected = blossom.get_maximum_matching(graph, get_exposed_matching(graph), engine=blossom.ENGINE_BASES)
+                solution = blossom.solve(graph, warm_start=seed % 2 == 0)
+                self.assertEqual(solution.get_engine(), blossom.ENGINE_HOPCROFT_KARP)
+                self.assertEqual(solution.get_size(), len(expected.edges))
+                assert_is_matching(self, graph, solution.get_matching())
+                actual = blossom.get_maximum_matching(graph, get_exposed_matching(graph), engine=blossom.ENGINE_HOPCROFT_KARP)
+                self.assertEqual(len(actual.edges), len(expected.edges))
+        graph = blossom.Graph()
+        for edge in ((0, 1), (0, 5), (1, 2), (1, 3), (1, 4), (1, 5)):
+            graph.add_edge(edge)
+        self.assertFalse(blossom.is_bipartite(graph))
+        solution = blossom.solve(graph)
+        self.assertEqual(solution.get_engine(), blossom.ENGINE_CONTRACT)
+        self.assertEqual(solution.get_size(), 2)
+        self.assertEqual(blossom.solve(graph, engine=blossom.ENGINE_BASES).get_engine(), blossom.ENGINE_BASES)
+
+    def test20(self):
+
+        # INPUT:
+        #   The edges of test1 with repeats, reversals and self-loops, as pairs, an array and edge-list files
+
+        # EXPECTED:
+        #   Every loader builds the same graph as add_edge with every vertice exposed
+
+        edges = [(0, 1), (0, 5), (1, 2), (1, 3), (1, 4), (1, 5), (1, 0), (5, 0), (3, 3), (1, 2)]
+        expected = blossom.Graph()
+        for edge in ((0, 1), (0, 5), (1, 2), (1, 3), (1, 4), (1, 5)):
+            expected.add_edge(edge)
+        sources = [edges]
+        if blossom.numpy is not None:
+            sources.append(blossom.numpy.array(edges))
+        with tempfile.TemporaryDirectory() as directory:
+            text_path = os.path.join(directory, 'edges.txt')
+            with open(text_path, 'w') as file:
+                file.write('\n'.join('%d %d' % edge for edge in edges) + '\n')
+            binary_path = os.path.join(directory, 'edges.bin')
+            with open(binary_path, 'wb') as file:
+                array.array('i', [v for edge in edges for v in edge]).tofile(file)
+            for compact in (False, True):
+                loaded = [blossom.load_graph(source, compact=compact) for source in sources]
+                loaded.append(blossom.load_graph_file(text_path, compact=compact))
+                loaded.append(blossom.load_graph_file(binary_path, binary=True, compact=compact))
+                for graph, matching in loaded:
+                    if compact:
+                        self.assertEqual(graph.get_edge_count(), 6)
+                        self.assertEqual({v: set(graph.get_neighbors(v)) for v in graph.get_vertices()}, expected.adjacency)
+                        self.assertEqual(sorted(matching.get_exposed_vertices()), [0, 1, 2, 3, 4, 5])
+                    else:
+                        self.assertEqual(graph.adjacency, expected.adjacency)
+                        self.assertEqual(matching.exposed_vertices, set(range(6)))
+                    self.assertEqual(len(blossom.get_maximum_matching(graph, matching).get_edges()), 2)
+            for text in ('# comment\n0 1\n', '0 1\n2\n', '0 1 2\n3\n', '0 x\n', '0 -\n', '0 1-2\n'):
+                with open(text_path, 'w') as file:
+                    file.write(text)
+                self.assertRaises(AssertionError, blossom.load_graph_file, text_path)
+        graph, matching = blossom.load_graph([])
+        self.assertEqual(graph.adjacency, {})
+        self.assertEqual(matching.adjacency, {})
+
+    def test21(self):
+
+        # INPUT:
+        #   Random graphs streamed edge by edge from a generator at the default epsilon and at a fifth, random bipartite
+        #   graphs at a fifth, a stream whose only augmenting path is seen before its middle edge is matched, and a
+        #   path whose stream order needs three passes to grow trees from both ends until they meet
+        #
+        #   0   1
+        #    `. |`.
+        #      `5--4         0--1==2--3==4--5==6--7==8--9
+        #       |
+        #       3--2
+
+        # EXPECTED:
+        #   Random graphs finish to maximum, bipartite ones start within epsilon of it, the second pass augments
+        #   0-5=4-1, and the path is only augmented once epsilon gives a phase three passes
+
+        for seed in range(20):
+            graph = get_random_graph(2 + seed, 0.3, seed)
+            edges = [(v, w) for v in graph.adjacency for w in graph.adjacency[v] if v < w]
+            random.Random(seed).shuffle(edges)
+            expected = blossom.get_maximum_matching(graph, get_exposed_matching(graph))
+            for epsilon in (None, 0.2):
+                matching = blossom.get_streaming_matching(lambda: (edge for edge in edges), epsilon=epsilon)
+                assert_is_matching(self, graph, matching)
+                self.assertEqual(set(matching.adjacency), set(graph.adjacency))
+                self.assertEqual(len(blossom.get_maximum_matching(graph, matching).edges), len(expected.edges))
+            rng = random.Random(seed)
+            edges = [(v, w) for v in range(0, 40, 2) for w in range(1, 40, 2) if rng.random() < 0.1]
+            graph, _ = blossom.load_graph(edges)
+            expected = blossom.get_maximum_matching(graph, get_exposed_matching(graph))
+            matching = blossom.get_streaming_matching(edges, epsilon=0.2)
+            self.assertGreaterEqual(len(matching.edges), 0.8 * len(expected.edges))
+        edges = [(4, 5), (0, 5), (1, 5), (3, 5), (2, 3), (1, 4)]
+        self.assertEqual(blossom.get_streaming_matching(edges, passes=0).edges, {(2, 3), (4, 5)})
+        self.assertEqual(blossom.get_streaming_matching(edges, passes=1).edges, {(0, 5), (1, 4), (2, 3)})
+        edges = [(1, 2), (3, 4), (5, 6), (7, 8), (4, 5), (2, 3), (6, 7), (0, 1), (8, 9)]
+        self.assertEqual(len(blossom.get_streaming_matching(edges).edges), 4)
+        self.assertEqual(len(blossom.get_streaming_matching(edges, passes=2, epsilon=0.25).edges), 4)
+        self.assertEqual(len(blossom.get_streaming_matching(edges, epsilon=0.25).edges), 5)
+
+    def test22(self):
+
+        # INPUT:
+        #   The graph and matching of test11, watched through a Stats subclass recording every event
+
+        # EXPECTED:
+        #   One augmentation through nested blossoms, with the hooks called as often as the counters say
+
+        class RecordingStats(blossom.Stats):
+
+            def __init__(self):
+                super().__init__()
+                self.events = []
+
+            def on_augment(self, path):
+                super().on_augment(path)
+                self.events.append(('augment', path))
+
+            def on_blossom(self, size, depth):
+                super().on_blossom(size, depth)
+                self.events.append(('blossom', depth))
+
+        edges = [(0, 1), (0, 2), (0, 7), (0, 9), (1, 2), (1, 3), (1, 5), (1, 7), (2, 4), (2, 5), (2, 8), (2, 9), (3, 5), (3, 7), (4, 5), (6, 9), (8, 9)]
+        for engine in (blossom.ENGINE_CONTRACT, blossom.ENGINE_BASES, blossom.ENGINE_FOREST):
+            graph, matching = blossom.load_graph(edges)
+            for edge in ((0, 2), (1, 7), (3, 5), (6, 9)):
+                matching.augment_in_place(edge)
+            stats = RecordingStats()
+            matching = blossom.get_maximum_matching(graph, matching, engine=engine, stats=stats)
+            self.assertEqual(len(matching.edges), 5)
+            self.assertEqual(stats.augmentation_count, 1)
+            self.assertGreaterEqual(stats.contraction_count, 1)
+            self.assertGreaterEqual(stats.search_count, 2)
+            self.assertGreater(stats.edge_scan_count, 0)
+            self.assertTrue(2 <= stats.max_forest_size <= 10)
+            self.assertEqual(stats.depth, 0)
+            augmentations = [event for event in stats.events if event[0] == 'augment']
+            self.assertEqual(len(augmentations), 1)
+            self.assertEqual(set(augmentations[0][1]), set(range(10)) - {6, 9})
+            self.assertEqual(len(stats.events), stats.augmentation_count + stats.contraction_count)
+            self.assertEqual(max(depth for event, depth in stats.events if event == 'blossom'), stats.max_depth)
+        stats = blossom.Stats()
+        graph, matching = blossom.load_graph([(0, 1), (1, 2)])
+        self.assertEqual(len(blossom.get_augmenting_path(graph, matching, stats=stats)), 2)
+        self.assertEqual(stats.augmentation_count, 0)
+        self.assertEqual(stats.search_count, 1)
+
+    def test23(self):
+
+        # INPUT:
+        #   The graph of test1 relabelled with negative integers, and random graphs shared by sessions on a thread pool
+
+        # EXPECTED:
+        #   Negative labels match like any others, every session finds the maximum without touching the graph, and a
+        #   session reused across graphs of different sizes leaves its scratch clean after every search
+
+        graph = blossom.Graph()
+        for v, w in ((0, 1), (0, 5), (1, 2), (1, 3), (1, 4), (1, 5)):
+            graph.add_edge((-v - 1, -w - 1))
+        solver = blossom.Solver(engine=blossom.ENGINE_CONTRACT)
+        for _ in range(2):
+            matching = solver.get_maximum_matching(graph, get_exposed_matching(graph))
+            assert_is_matching(self, graph, matching)
+            self.assertEqual(len(matching.edges), 2)
+        graphs = [get_random_graph(12, 0.3, seed) for seed in range(8)]
+        expected = [len(blossom.get_maximum_matching(graph, get_exposed_matching(graph), engine=blossom.ENGINE_BASES).edges) for graph in graphs]
+        adjacencies = [{t: set(graph.adjacency[t]) for t in graph.adjacency} for graph in graphs]
+
+        def solve_all(engine):
+            solver = blossom.Solver(engine=engine, validation=blossom.VALIDATION_LOCAL)
+            return [len(solver.get_maximum_matching(graph, get_exposed_matching(graph)).edges) for graph in graphs]
+
+        with concurrent.futures.ThreadPoolExecutor(4) as executor:
+            engines = [blossom.ENGINE_CONTRACT, blossom.ENGINE_FOREST] * 4
+            for actual in executor.map(solve_all, engines):
+                self.assertEqual(actual, expected)
+        for graph, adjacency in zip(graphs, adjacencies):
+            self.assertEqual(graph.adjacency, adjacency)
+        solver = blossom.Solver(engine=blossom.ENGINE_BASES, validation=blossom.VALIDATION_FULL)
+        graph = get_random_graph(30, 0.1, 8)
+        self.assertEqual(len(solver.get_maximum_matching(graph, get_exposed_matching(graph)).edges), len(blossom.get_maximum_matching(graph, get_exposed_matching(graph)).edges))
+        self.assertEqual([len(solver.get_maximum_matching(graph, get_exposed_matching(graph)).edges) for graph in graphs], expected)
+
+    def test24(self):
+
+        # INPUT:
+        #       ,-1
+        #   3--0  |`--5
+        #       `-2--4
+
+        # EXPECTED:
+        #   Lifting through blossom 0-1=2 takes the even side of the cycle from the base at either end or inside a path
+
+        graph = blossom.Graph()
+        for edge in ((0, 1), (0, 2), (1, 2), (0, 3), (1, 5), (2, 4)):
+            graph.add_edge(edge)
+        solver = blossom.Solver()
+        cycle = blossom.Blossom([0, 1, 2], 0, solver.get_blossom_id())
+        graph.contract(cycle)
+        b = cycle.get_id()
+        self.assertEqual(cycle.get_path_to(2), [0, 1, 2])
+        self.assertEqual(cycle.get_path_to(1), [0, 2, 1])
+        self.assertEqual(list(cycle.traverse_left()), [0, 2, 1])
+        self.assertEqual(graph.lift_path([3, b, 4], cycle), [3, 0, 1, 2, 4])
+        self.assertEqual(graph.lift_path([4, b, 3], cycle), [4, 2, 1, 0, 3])
+        self.assertEqual(graph.lift_path([3, b, 5], cycle), [3, 0, 2, 1, 5])
+        self.assertEqual(graph.lift_path([b, 4], cycle), [0, 1, 2, 4])
+        self.assertEqual(graph.lift_path([5, b], cycle), [5, 1, 2, 0])
+        self.assertEqual(graph.lift_path([b, 3], cycle), [0, 3])
+
+    def test25(self):
+
+        # INPUT:
+        #   0--1--2--3--4
+        #   |     `--5--6
+        #   `--10--11
+
+        # EXPECTED:
+        #   Blossoms close at the common ancestor of both ends, whether it is near or far from either of them
+
+        forest = blossom.Forest()
+        forest.add_singleton_tree(0)
+        for edge in ((1, 0), (2, 1), (3, 2), (4, 3), (5, 2), (6, 5), (10, 0), (11, 10)):
+            forest.add_edge(edge)
+        solver = blossom.Solver()
+        self.assertEqual(len(forest), 9)
+        self.assertEqual(forest.get_root(6), 0)
+        self.assertEqual(forest.get_distance_to_root(11), 2)
+        self.assertEqual(forest.get_path_to_root_from(6), [6, 5, 2, 1, 0])
+        self.assertEqual(forest.get_blossom(4, 6, solver.get_blossom_id()).vertices, [2, 3, 4, 6, 5])
+        self.assertEqual(forest.get_blossom(4, 11, solver.get_blossom_id()).vertices, [0, 1, 2, 3, 4, 11, 10])
+        self.assertEqual(forest.get_blossom(11, 4, solver.get_blossom_id()).vertices, [0, 10, 11, 4, 3, 2, 1])
+        self.assertEqual(forest.get_blossom(6, 4, solver.get_blossom_id()).get_base(), 2)
+
+    def test26(self):
+
+        # INPUT:
+        #   0--1--2--3--4--0, with 5 hanging off 2
+
+        # EXPECTED:
+        #   Searching reads the graph without touching it, so searching again finds the same path from a fresh start
+
+        graph = blossom.Graph()
+        for edge in ((0, 1), (1, 2), (2, 3), (3, 4), (4, 0), (2, 5)):
+            graph.add_edge(edge)
+        matching = get_exposed_matching(graph)
+        for edge in ((0, 1), (2, 3)):
+            matching = matching.augment(list(edge))
+        adjacency = {t: set(graph.adjacency[t]) for t in graph.adjacency}
+        path = blossom.get_augmenting_path(graph, matching, engine=blossom.ENGINE_CONTRACT)
+        self.assertEqual(sorted((path[0], path[-1])), [4, 5])
+        self.assertEqual(graph.adjacency, adjacency)
+        self.assertEqual(blossom.get_augmenting_path(graph, matching, engine=blossom.ENGINE_CONTRACT), path)
+        self.assertEqual(len(blossom.get_maximum_matching(graph, matching, engine=blossom.ENGINE_CONTRACT).edges), 3)
+
+    def test27(self):
+
+        # INPUT:
+        #   A random graph with a maximum matching of 20 edges, solved under each limit by every engine
+
+        # EXPECTED:
+        #   Each limit stops at a valid matching with the matching status, and no limit leaves a proven maximum
+
+        graph = get_random_graph(40, 0.2, 3)
+        for engine in (blossom.ENGINE_CONTRACT, blossom.ENGINE_BASES, blossom.ENGINE_FOREST):
+            solver = blossom.Solver(engine=engine)
+            solution = solver.solve(graph, warm_start=False)
+            self.assertEqual((solution.get_size(), solution.get_status()), (20, blossom.STATUS_MAXIMUM))
+            solution = solver.solve(graph, warm_start=False, target_size=7)
+            self.assertEqual((solution.get_size(), solution.get_status()), (7, blossom.STATUS_TARGET))
+            solution = solver.solve(graph, warm_start=False, max_augmentations=5)
+            self.assertEqual((solution.get_size(), solution.get_status()), (5, blossom.STATUS_BUDGET))
+            solution = solver.solve(graph, warm_start=False, deadline=time.monotonic() - 1)
+            self.assertEqual((solution.get_size(), solution.get_status()), (0, blossom.STATUS_BUDGET))
+            solution = solver.solve(graph, target_size=1)
+            self.assertEqual((solution.get_size(), solution.get_status()), (solution.get_warm_start_size(), blossom.STATUS_TARGET))
+            matching = solver.get_maximum_matching(graph, get_exposed_matching(graph), max_augmentations=12)
+            assert_is_matching(self, graph, matching)
+            self.assertEqual(len(matching.edges), 12)
+        solution = blossom.solve(blossom.load_graph([(v, v + 1) for v in range(0, 20, 2)], compact=True)[0], warm_start=False, max_augmentations=3)
+        self.assertEqual((solution.get_size(), solution.get_status()), (3, blossom.STATUS_BUDGET))
+
+    def test28(self):
+
+        # INPUT:
+        #        2
+        #        |
+        #   0----1--3
+        #    \  / \
+        #     5    4
+
+        # EXPECTED:
+        #   Leaves 2, 3 and 4 are even, their hub 1 is the odd barrier, and the triangle side 0-5 is never reached
+
+        graph = blossom.Graph()
+        for edge in ((0, 1), (0, 5), (1, 2), (1, 3), (1, 4), (1, 5)):
+            graph.add_edge(edge)
+        solution = blossom.solve(graph, certify=True)
+        certificate = solution.get_certificate()
+        self.assertEqual(sorted(certificate.get_even_vertices()), [2, 3, 4])
+        self.assertEqual(certificate.get_odd_vertices(), [1])
+        self.assertEqual(sorted(certificate.get_unreached_vertices()), [0, 5])
+        self.assertTrue(blossom.verify_certificate(graph, solution.get_matching(), certificate))
+        matching = get_exposed_matching(graph).augment([0, 1])
+        self.assertIsNone(blossom.get_certificate(graph, matching))
+        self.assertFalse(blossom.verify_certificate(graph, matching, certificate))
+        self.assertFalse(blossom.verify_certificate(graph, solution.get_matching(), blossom.Certificate([], [], [])))
+        matching = get_exposed_matching(graph)
+        matching.add_vertices([6, 7])
+        self.assertFalse(blossom.verify_certificate(graph, matching.augment([6, 7]), certificate))
+        for seed in range(10):
+            graph = get_random_graph(30, 0.1, seed)
+            for engine in (blossom.ENGINE_CONTRACT, blossom.ENGINE_BASES, blossom.ENGINE_FOREST):
+                solution = blossom.solve(graph, engine=engine, certify=True)
+                self.assertTrue(blossom.verify_certificate(graph, solution.get_matching(), solution.get_certificate()))
+            solution = blossom.solve(graph, engine=blossom.ENGINE_BASES, max_augmentations=1, warm_start=False, certify=True)
+            self.assertIsNone(solution.get_certificate())
+        graph, matching = blossom.load_graph([(v, (v + 1) % 7) for v in range(7)], compact=True)
+        solution = blossom.solve(graph, matching, certify=True)
+        self.assertEqual(len(solution.get_certificate().get_even_vertices()), 7)
+        self.assertTrue(blossom.verify_certificate(graph, solution.get_matching(), solution.get_certificate()))
+        matching = blossom.Matching()
+        matching.add_vertices([7, 8])
+        self.assertFalse(blossom.verify_certificate(graph, matching.augment([7, 8]), solution.get_certificate()))
+
+    @unittest.skipIf(blossom.numpy is None, 'NumPy is not installed')
+    def test29(self):
+
+        # INPUT:
+        #   0--1--2--3--4--5 labelled 10 to 15, scored against matchings with missing edges, unknown labels and
+        #   shared vertices, and against maximum matchings of a random graph
+
+        # EXPECTED:
+        #   Each score counts the edges not in the graph, the repeated vertices and the exposed vertices
+
+        numpy = blossom.numpy
+        graph, _ = blossom.load_graph(numpy.array([(10 + v, 11 + v) for v in range(5)]), compact=True)
+        scores = blossom.score_matchings(graph, [
+            numpy.array([(10, 11), (12, 13), (14, 15)]),
+            numpy.array([(11, 10), (13, 14)]),
+            numpy.array([(10, 12), (13, 14), (15, 99)]),
+            numpy.array([(10, 11), (11, 12), (12, 12)]),
+            numpy.zeros((0, 2), dtype=int),
+        ])
+        self.assertEqual(len(scores), 5)
+        self.assertEqual(scores.get_sizes().tolist(), [3, 2, 3, 3, 0])
+        self.assertEqual(scores.get_missing_edge_counts().tolist(), [0, 0, 2, 1, 0])
+        self.assertEqual(scores.get_conflict_counts().tolist(), [0, 0, 0, 3, 0])
+        self.assertEqual(scores.get_exposed_counts().tolist(), [0, 2, 4, 3, 6])
+        self.assertEqual(scores.get_valid().tolist(), [True, True, False, False, True])
+        self.assertEqual(blossom.score_matching(graph, [(10, 11), (14, 15)]).get_exposed_counts().tolist(), [2])
+        random_graph = get_random_graph(60, 0.08, 5)
+        edges = numpy.array([(v, w) for v in random_graph.adjacency for w in random_graph.adjacency[v] if v < w])
+        graph, matching = blossom.load_graph(edges, compact=True)
+        matchings = [numpy.array(sorted(blossom.solve(graph, matching, seed=seed).get_matching().get_edges())) for seed in range(4)]
+        scores = blossom.score_matchings(graph, matchings)
+        self.assertTrue(scores.get_valid().all())
+        self.assertEqual(len(set(scores.get_sizes().tolist())), 1)
+        self.assertEqual(scores.get_exposed_counts().tolist(), [len(graph) - 2 * size for size in scores.get_sizes().tolist()])
+
+    def test30(self):
+
+        # INPUT:
+        #   A random compact graph labelled from 100, solved with a checkpoint every 3 augmentations, the same graph
+        #   with its labels replaced by indices, and a-b
+
+        # EXPECTED:
+        #   Snapshots load back the same graph and matching, and a solve resumed from the last checkpoint only makes
+        #   the augmentations that remained without changing the snapshot. String labels cannot be saved
+
+        random_graph = get_random_graph(40, 0.1, 7)
+        edges = [(100 + v, 100 + w) for v in random_graph.adjacency for w in random_graph.adjacency[v] if v < w]
+        graph, matching = blossom.load_graph(edges, compact=True)
+        maximum = len(blossom.get_maximum_matching(graph, matching).get_edges())
+        with tempfile.TemporaryDirectory() as directory:
+            graph_path = os.path.join(directory, 'graph.bin')
+            matching_path = os.path.join(directory, 'matching.bin')
+            blossom.save_graph(graph, graph_path)
+            sizes = []
+
+            def checkpoint(matching):
+                sizes.append(len(matching.get_edges()))
+                blossom.save_matching(matching, matching_path)
+
+            blossom.get_maximum_matching(graph, matching, engine=blossom.ENGINE_BASES, checkpoint=checkpoint, checkpoint_interval=3)
+            self.assertEqual(sizes, list(range(3, maximum + 1, 3)))
+            self.assertEqual(sorted(os.listdir(directory)), ['graph.bin', 'matching.bin'])
+            loaded, _ = blossom.load_graph_snapshot(graph_path)
+            self.assertEqual(loaded.get_vertices(), graph.get_vertices())
+            self.assertEqual({v: sorted(loaded.get_neighbors(v)) for v in loaded.get_vertices()}, {v: sorted(graph.get_neighbors(v)) for v in graph.get_vertices()})
+            resumed = blossom.load_matching_snapshot(matching_path, loaded)
+            self.assertEqual(len(resumed.get_edges()), sizes[-1])
+            stats = blossom.Stats()
+            resumed = blossom.get_maximum_matching(loaded, resumed, stats=stats)
+            self.assertEqual(len(resumed.get_edges()), maximum)
+            self.assertEqual(stats.augmentation_count, maximum - sizes[-1])
+            self.assertEqual(len(blossom.load_matching_snapshot(matching_path, loaded).get_edges()), sizes[-1])
+            self.assertRaises(AssertionError, blossom.save_graph, blossom.CompactGraph([('a', 'b')]), graph_path)
+            indexed = blossom.CompactGraph(offsets=graph.offsets, neighbors=graph.neighbors)
+            blossom.save_graph(indexed, graph_path)
+            loaded, matching = blossom.load_graph_snapshot(graph_path)
+            self.assertEqual(loaded.get_vertices(), list(range(len(graph))))
+            self.assertEqual(blossom.solve(loaded, matching).get_size(), maximum)
+            del loaded, matching, resumed
+
+    def test31(self):
+
+        # INPUT:
+        #   0--1--2--...--19, with 0-1 and 18-19 left exposed and every other edge alternately matched, and sparse
+        #   random graphs solved with decreasing epsilon
+
+        # EXPECTED:
+        #   A long path is out of reach of a short bound, and every guarantee reported is at most the true ratio
+
+        graph = blossom.Graph()
+        for v in range(19):
+            graph.add_edge((v, v + 1))
+        matching = get_exposed_matching(graph)
+        for v in range(1, 18, 2):
+            matching = matching.augment([v, v + 1])
+        solution = blossom.solve(graph, matching, warm_start=False, epsilon=0.5)
+        self.assertEqual((solution.get_size(), solution.get_status()), (9, blossom.STATUS_APPROXIMATE))
+        self.assertTrue(0.5 <= solution.get_guarantee() < 1.0)
+        solution = blossom.solve(graph, matching, warm_start=False, epsilon=0.1)
+        self.assertEqual((solution.get_size(), solution.get_status(), solution.get_guarantee()), (10, blossom.STATUS_MAXIMUM, 1.0))
+        self.assertEqual(len(blossom.get_maximum_matching(graph, matching, epsilon=0.5).get_edges()), 9)
+        for seed in range(10):
+            graph = get_random_graph(60, 0.04, seed)
+            maximum = blossom.solve(graph).get_size()
+            for epsilon in (0.5, 0.2, 0.05):
+                solution = blossom.solve(graph, epsilon=epsilon)
+                assert_is_matching(self, graph, solution.get_matching())
+                self.assertLessEqual(solution.get_guarantee(), solution.get_size() / maximum)
+                self.assertGreaterEqual(solution.get_guarantee(), 0.5)
+        self.assertIsNone(blossom.solve(graph, max_augmentations=0, warm_start=False).get_guarantee())
+
+    def test32(self):
+
+        # INPUT:
+        #   A random graph solved by the generator every 4 augmentations, by the coroutine next to a ticking task, and
+        #   by a coroutine cancelled after a few pauses
+
+        # EXPECTED:
+        #   Intermediate matchings grow to the maximum, the ticking task keeps running during the solve, and the
+        #   cancelled solve returns a smaller but valid matching
+
+        graph = get_random_graph(80, 0.05, 11)
+        maximum = blossom.solve(graph).get_size()
+        sizes = [len(matching.edges) for matching in blossom.get_matchings(graph, interval=4)]
+        self.assertEqual(sizes, list(range(4, maximum, 4)) + [maximum])
+        for matching in blossom.get_matchings(graph, engine=blossom.ENGINE_BASES, interval=1000):
+            self.assertEqual(len(matching.edges), maximum)
+        reports = []
+        ticks = []
+
+        async def tick():
+            while True:
+                ticks.append(len(reports))
+                await asyncio.sleep(0)
+
+        async def solve_next_to_ticks():
+            ticker = asyncio.ensure_future(tick())
+            solution = await blossom.solve_async(graph, edge_scan_interval=50, progress=lambda size, count: reports.append(size))
+            ticker.cancel()
+            return solution
+
+        solution = asyncio.run(solve_next_to_ticks())
+        self.assertEqual((solution.get_size(), solution.get_status()), (maximum, blossom.STATUS_MAXIMUM))
+        self.assertEqual(reports[-1], maximum)
+        self.assertEqual(solution.get_guarantee(), 1.0)
+        self.assertGreater(len(set(ticks)), maximum // 2)
+
+        async def solve_then_cancel():
+            task = asyncio.ensure_future(blossom.solve_async(graph, edge_scan_interval=50))
+            for _ in range(5):
+                await asyncio.sleep(0)
+            task.cancel()
+            return await task
+
+        solution = asyncio.run(solve_then_cancel())
+        assert_is_matching(self, graph, solution.get_matching())
+        self.assertEqual(solution.get_status(), blossom.STATUS_CANCELLED)
+        self.assertLess(solution.get_size(), maximum)
+        self.assertIsNone(solution.get_guarantee())
+
+    def test33(self):
+
+        # INPUT:
+        #   0--1--2--3--4--5--6, a 5-cycle, K4 with a pendant path 4--5, K4 with a separate edge solved to an epsilon
+        #   under a deadline already passed, and random sparse graphs both as dicts and compact graphs
+
+        # EXPECTED:
+        #   Paths and cycles reduce away entirely, K4 is left untouched once its pendant is matched, and unfolding
+        #   always gives a maximum matching of the original graph. A residual solve stopped before matching anything
+        #   gives no guarantee to rescale
+
+        graph = blossom.Graph()
+        for v in range(6):
+            graph.add_edge((v, v + 1))
+        kernel = blossom.Kernel(graph)
+        self.assertEqual(kernel.get_graph().adjacency, {})
+        self.assertEqual(kernel.get_reduction_ratio(), 1.0)
+        matching = kernel.get_matching(get_exposed_matching(kernel.get_graph()))
+        assert_is_matching(self, graph, matching)
+        self.assertEqual(len(matching.edges), 3)
+        graph = blossom.Graph()
+        for v in range(5):
+            graph.add_edge((v, (v + 1) % 5))
+        kernel = blossom.Kernel(graph)
+        self.assertEqual(kernel.get_graph().adjacency, {})
+        self.assertEqual(len(kernel.get_matching(blossom.Matching()).edges), 2)
+        graph = blossom.Graph()
+        for edge in ((0, 1), (0, 2), (0, 3), (1, 2), (1, 3), (2, 3), (3, 4), (4, 5)):
+            graph.add_edge(edge)
+        kernel = blossom.Kernel(graph)
+        self.assertEqual(sorted(kernel.get_graph().get_vertices()), [0, 1, 2, 3])
+        self.assertAlmostEqual(kernel.get_reduction_ratio(), 1 / 3)
+        solution = blossom.solve(graph, kernelize=True)
+        self.assertEqual((solution.get_size(), solution.get_reduction_ratio()), (3, kernel.get_reduction_ratio()))
+        self.assertIsNone(blossom.solve(graph).get_reduction_ratio())
+        graph = blossom.Graph()
+        for edge in ((0, 1), (0, 2), (0, 3), (1, 2), (1, 3), (2, 3), (4, 5)):
+            graph.add_edge(edge)
+        solution = blossom.solve(graph, kernelize=True, epsilon=0.1, deadline=time.monotonic() - 1, warm_start=False)
+        assert_is_matching(self, graph, solution.get_matching())
+        self.assertEqual((solution.get_size(), solution.get_status(), solution.get_guarantee()), (1, blossom.STATUS_BUDGET, 0.0))
+        for seed in range(20):
+            graph = get_random_graph(50, 0.05, seed)
+            maximum = blossom.solve(graph).get_size()
+            solution = blossom.solve(graph, kernelize=True, certify=True)
+            assert_is_matching(self, graph, solution.get_matching())
+            self.assertEqual(solution.get_size(), maximum)
+            self.assertTrue(blossom.verify_certificate(graph, solution.get_matching(), solution.get_certificate()))
+            edges = [(v, w) for v in graph.adjacency for w in graph.adjacency[v] if v < w]
+            compact, _ = blossom.load_graph(edges, compact=True)
+            solution = blossom.solve(compact, kernelize=True)
+            self.assertIsInstance(solution.get_matching(), blossom.CompactMatching)
+            self.assertEqual(solution.get_size(), maximum)
+
+    def test34(self):
+
+        # INPUT:
+        #   Four copies of a random component under shuffled labels, a triangle and a path, cached in memory, with
+        #   small entry and byte limits, and on disk
+
+        # EXPECTED:
+        #   Copies after the first hit the cache and still match maximally, limits evict the oldest entries, and a
+        #   fresh cache over the same directory hits without solving
+
+        template = get_random_graph(16, 0.25, 2)
+        graph = blossom.Graph()
+        for copy in range(4):
+            labels = list(range(100 * copy, 100 * copy + 16))
+            random.Random(copy).shuffle(labels)
+            for v in template.adjacency:
+                for w in template.adjacency[v]:
+                    if v < w:
+                        graph.add_edge((labels[v], labels[w]))
+        for edge in ((1000, 1001), (1001, 1002), (1002, 1000), (2000, 2001), (2001, 2002)):
+            graph.add_edge(edge)
+        maximum = blossom.solve(graph).get_size()
+        cache = blossom.MatchingCache()
+        matching = cache.get_maximum_matching(graph)
+        assert_is_matching(self, graph, matching)
+        self.assertEqual(len(matching.edges), maximum)
+        self.assertEqual((cache.get_hit_count(), cache.get_miss_count(), len(cache)), (3, 3, 3))
+        self.assertEqual(len(cache.get_maximum_matching(graph).edges), maximum)
+        self.assertEqual((cache.get_hit_count(), cache.get_miss_count()), (9, 3))
+        compact, _ = blossom.load_graph([(v, w) for v in graph.adjacency for w in graph.adjacency[v] if v < w], compact=True)
+        self.assertEqual(len(cache.get_maximum_matching(compact).get_edges()), maximum)
+        self.assertEqual(cache.get_hit_count(), 15)
+        cache = blossom.MatchingCache(max_entries=2)
+        cache.get_maximum_matching(graph)
+        self.assertEqual(len(cache), 2)
+        cache = blossom.MatchingCache(max_bytes=100)
+        cache.get_maximum_matching(graph)
+        self.assertLessEqual(cache.get_byte_count(), 100)
+        with tempfile.TemporaryDirectory() as directory:
+            blossom.MatchingCache(max_entries=1, path=directory).get_maximum_matching(graph)
+            self.assertEqual(len(os.listdir(directory)), 3)
+            cache = blossom.MatchingCache(path=directory)
+            matching = cache.get_maximum_matching(graph)
+            assert_is_matching(self, graph, matching)
+            self.assertEqual(len(matching.edges), maximum)
+            self.assertEqual((cache.get_hit_count(), cache.get_miss_count()), (6, 0))
+
 if __name__ == '__main__':
     unittest.main()
 